@@ -19,6 +19,8 @@ EXOSPHERE_STATE_MANAGER_URI = os.getenv("EXOSPHERE_STATE_MANAGER_URI", "http://l
 EXOSPHERE_API_KEY = os.getenv("EXOSPHERE_API_KEY", "exosphere@123")  # TODO: Replace with your actual API key
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "{{GEMINI_API_KEY}}")
 DATABASE_URL = os.getenv("DATABASE_URL", "{{DATABASE_URL}}")
+# Set to "false" to use the separate FileParsingNode + BatchRequestNode pair
+USE_FUSED_PARSE_AND_REQUEST = os.getenv("USE_FUSED_PARSE_AND_REQUEST", "true").lower() == "true"
 
 async def create_graph():
     """Create a graph with batch document processing nodes using Exosphere Python SDK"""
@@ -28,6 +30,46 @@ async def create_graph():
         key=EXOSPHERE_API_KEY
     )
 
+    if USE_FUSED_PARSE_AND_REQUEST:
+        # Parse files and submit the batch in one node, without passing the text through the state manager
+        submit_node = "file_parse_and_request"
+        request_nodes = [
+            GraphNodeModel(
+                node_name="FileParseAndRequestNode",
+                namespace="batch-process-docs",
+                identifier="file_parse_and_request",
+                inputs={
+                    "chunk": "${{ chunking.outputs.chunk }}",
+                    "prompt": "${{ store.prompt }}"
+                },
+                next_nodes=["polling"]
+            )
+        ]
+    else:
+        submit_node = "batch_request"
+        request_nodes = [
+            GraphNodeModel(
+                node_name="FileParsingNode",
+                namespace="batch-process-docs",
+                identifier="file_parsing",
+                inputs={
+                    "chunk": "${{ chunking.outputs.chunk }}"
+                },
+                next_nodes=["batch_request"]
+            ),
+            GraphNodeModel(
+                node_name="BatchRequestNode",
+                namespace="batch-process-docs",
+                identifier="batch_request",
+                inputs={
+                    "parsed_files": "${{ file_parsing.outputs.parsed_files }}",
+                    "task_id": "${{ file_parsing.outputs.task_id }}",
+                    "prompt": "${{ store.prompt }}"
+                },
+                next_nodes=["polling"]
+            )
+        ]
+
     graph_nodes = [
         GraphNodeModel(
             node_name="CSVInputNode",
@@ -44,37 +86,19 @@ async def create_graph():
             identifier="chunking",
             inputs={
                 "file_paths": "${{ csv_input.outputs.file_paths }}",
-                "chunk_size": "${{ store.chunk_size }}"
-            },
-            next_nodes=["file_parsing"]
-        ),
-        GraphNodeModel(
-            node_name="FileParsingNode",
-            namespace="batch-process-docs",
-            identifier="file_parsing",
-            inputs={
-                "chunk": "${{ chunking.outputs.chunk }}"
-            },
-            next_nodes=["batch_request"]
-        ),
-        GraphNodeModel(
-            node_name="BatchRequestNode",
-            namespace="batch-process-docs",
-            identifier="batch_request",
-            inputs={
-                "parsed_files": "${{ file_parsing.outputs.parsed_files }}",
-                "task_id": "${{ file_parsing.outputs.task_id }}",
-                "prompt": "${{ store.prompt }}"
+                "chunk_size": "${{ store.chunk_size }}",
+                "chunk_target_bytes": "${{ store.chunk_target_bytes }}"
             },
-            next_nodes=["polling"]
+            next_nodes=[request_nodes[0].identifier]
         ),
+        *request_nodes,
         GraphNodeModel(
             node_name="PollingNode",
             namespace="batch-process-docs",
             identifier="polling",
             inputs={
-                "task_id": "${{ batch_request.outputs.task_id }}",
-                "batch_info": "${{ batch_request.outputs.batch_info }}"
+                "task_id": "${{ " + submit_node + ".outputs.task_id }}",
+                "batch_info": "${{ " + submit_node + ".outputs.batch_info }}"
             },
             next_nodes=["split_results"]
         ),
@@ -133,6 +157,7 @@ async def create_graph():
         default_values={       
             "csv_file_path": "",
             "chunk_size": "5",
+            "chunk_target_bytes": "2000000",
             "prompt": "Extract key information from this document"
         }
     )
@@ -0,0 +1,320 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from typing import Optional
+from xml.etree import ElementTree
+
+# Optional document parsing libraries, imported once
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+try:
+    import pdfplumber
+except ImportError:
+    pdfplumber = None
+
+try:
+    import PyPDF2
+except ImportError:
+    PyPDF2 = None
+
+try:
+    from docx import Document
+except ImportError:
+    Document = None
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+# Directory holding the extracted text of previously parsed documents
+PARSE_CACHE_DIR = ".parse_cache"
+
+# Version of the extracted text format, part of every cache key. Bump it whenever extraction
+# output changes so stale entries are not served.
+PARSE_CACHE_VERSION = 2
+
+# Directory holding extracted text passed between nodes by reference.
+# Producer and consumer nodes must share this filesystem.
+CONTENT_STORE_DIR = os.path.join(tempfile.gettempdir(), "exo-docs")
+
+# Prefix of the content references emitted in node outputs
+CONTENT_REF_PREFIX = "sha256:"
+
+# Seconds a stored blob is kept after it was last written or re-stored. Blobs are only read by the
+# BatchRequestNode that follows the producing FileParsingNode, so a day leaves ample room for retries.
+CONTENT_STORE_TTL = int(os.getenv("EXO_CONTENT_STORE_TTL", "86400"))
+
+# Minimum seconds between sweeps of the content store for expired blobs, per process
+CONTENT_STORE_SWEEP_INTERVAL = 3600
+
+# Time of the last content store sweep in this process, guarded by _SWEEP_LOCK
+_last_sweep = 0.0
+_SWEEP_LOCK = threading.Lock()
+
+# PDFium is not thread-safe, even across documents, so every pdfium call in this process is serialized
+_PDFIUM_LOCK = threading.Lock()
+
+# WordprocessingML element tags read when extracting DOCX text
+_W_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_BODY = f"{_W_NAMESPACE}body"
+_W_PARAGRAPH = f"{_W_NAMESPACE}p"
+_W_RUN = f"{_W_NAMESPACE}r"
+_W_HYPERLINK = f"{_W_NAMESPACE}hyperlink"
+_W_BREAK = f"{_W_NAMESPACE}br"
+_W_BREAK_TYPE = f"{_W_NAMESPACE}type"
+_W_TEXT = f"{_W_NAMESPACE}t"
+
+# Run content elements with a fixed text equivalent, as translated by python-docx
+_W_RUN_CHARACTERS = {
+    f"{_W_NAMESPACE}tab": "\t",
+    f"{_W_NAMESPACE}ptab": "\t",
+    f"{_W_NAMESPACE}cr": "\n",
+    f"{_W_NAMESPACE}noBreakHyphen": "-",
+}
+
+
+def _write_atomic(path: str, content: str) -> None:
+    """Write text to a private temp file and rename it into place so readers never see partial content."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _cache_path(file_path: str) -> str:
+    """Build the cache entry path for a file from its absolute path, mtime and size."""
+    stat = os.stat(file_path)
+    key = hashlib.blake2b(
+        f"{PARSE_CACHE_VERSION}:{os.path.abspath(file_path)}:{stat.st_mtime_ns}:{stat.st_size}".encode("utf-8"),
+        digest_size=16
+    ).hexdigest()
+    return os.path.join(PARSE_CACHE_DIR, f"{key}.txt")
+
+
+def load_cached_content(file_path: str) -> Optional[str]:
+    """Return the cached extracted text for an unchanged file, or None on a cache miss."""
+    try:
+        with open(_cache_path(file_path), 'r', encoding='utf-8', newline='') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def store_cached_content(file_path: str, content: str) -> None:
+    """Persist extracted text for a file. A failed write only costs a future re-parse."""
+    try:
+        cache_path = _cache_path(file_path)
+        os.makedirs(PARSE_CACHE_DIR, exist_ok=True)
+        _write_atomic(cache_path, content)
+    except OSError as e:
+        logger.warning(f"Failed to cache parsed content for {file_path}: {e}")
+
+
+def store_content(content: str) -> str:
+    """
+    Store extracted text in the content store.
+    
+    Args:
+        content: Text to store
+        
+    Returns:
+        Content reference of the form "sha256:<hex digest>"
+    """
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    blob_path = os.path.join(CONTENT_STORE_DIR, f"{digest}.txt")
+    try:
+        # Identical content is already stored under the same digest; refresh its age so it is not evicted
+        os.utime(blob_path)
+    except FileNotFoundError:
+        os.makedirs(CONTENT_STORE_DIR, exist_ok=True)
+        _write_atomic(blob_path, content)
+    _evict_expired_content()
+    return f"{CONTENT_REF_PREFIX}{digest}"
+
+
+def _evict_expired_content() -> None:
+    """Remove content store blobs older than CONTENT_STORE_TTL, at most once per sweep interval."""
+    global _last_sweep
+    now = time.time()
+    if now - _last_sweep < CONTENT_STORE_SWEEP_INTERVAL or not _SWEEP_LOCK.acquire(blocking=False):
+        return
+    try:
+        if now - _last_sweep < CONTENT_STORE_SWEEP_INTERVAL:
+            return
+        _last_sweep = now
+        
+        removed = 0
+        cutoff = now - CONTENT_STORE_TTL
+        with os.scandir(CONTENT_STORE_DIR) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        removed += 1
+                except OSError:
+                    # Already removed by another process, or not ours to remove
+                    continue
+        if removed:
+            logger.info(f"Evicted {removed} expired blobs from the content store")
+    except OSError as e:
+        logger.warning(f"Failed to sweep the content store: {e}")
+    finally:
+        _SWEEP_LOCK.release()
+
+
+def load_content(content_ref: str) -> str:
+    """
+    Load text previously stored with store_content.
+    
+    Args:
+        content_ref: Content reference returned by store_content
+        
+    Returns:
+        The stored text
+    """
+    if not content_ref.startswith(CONTENT_REF_PREFIX):
+        raise ValueError(f"Unsupported content reference: {content_ref}")
+    digest = content_ref[len(CONTENT_REF_PREFIX):]
+    with open(os.path.join(CONTENT_STORE_DIR, f"{digest}.txt"), 'r', encoding='utf-8', newline='') as f:
+        return f.read()
+
+
+def _read_pdf_with_pdfium(file_path: str) -> str:
+    """Extract text from every page of a PDF using the C-backed PDFium engine."""
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            pages = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                pages.append(textpage.get_text_range())
+                textpage.close()
+                page.close()
+            return "\n".join(pages)
+        finally:
+            pdf.close()
+
+
+def _read_docx_xml(file_path: str) -> str:
+    """
+    Extract paragraph text from a DOCX by streaming word/document.xml, without building a document model.
+    
+    Matches python-docx's doc.paragraphs: only top-level body paragraphs are read (not table cells or
+    text boxes), and only the text of their runs, directly or inside hyperlinks.
+    """
+    paragraphs = []
+    runs = []
+    # Tags of the open ancestors of the current element
+    path = []
+    with zipfile.ZipFile(file_path) as archive, archive.open("word/document.xml") as document_xml:
+        for event, element in ElementTree.iterparse(document_xml, events=("start", "end")):
+            tag = element.tag
+            if event == "start":
+                path.append(tag)
+                continue
+            path.pop()
+            
+            # Run content counts only in runs of a body paragraph, or of a hyperlink in one
+            if len(path) >= 4 and path[-1] == _W_RUN and (
+                path[-3:-1] == [_W_BODY, _W_PARAGRAPH]
+                or (len(path) >= 5 and path[-4:-1] == [_W_BODY, _W_PARAGRAPH, _W_HYPERLINK])
+            ):
+                if tag == _W_TEXT:
+                    if element.text:
+                        runs.append(element.text)
+                elif tag == _W_BREAK:
+                    # Only line breaks produce text; page and column breaks do not
+                    if element.get(_W_BREAK_TYPE, "textWrapping") == "textWrapping":
+                        runs.append("\n")
+                elif tag in _W_RUN_CHARACTERS:
+                    runs.append(_W_RUN_CHARACTERS[tag])
+            elif tag == _W_PARAGRAPH and path[-1:] == [_W_BODY]:
+                paragraphs.append("".join(runs))
+                runs = []
+            
+            # Free each top-level body element once it has been read
+            if path[-1:] == [_W_BODY]:
+                element.clear()
+    return "\n".join(paragraphs)
+
+
+def read_file_content(file_path: str) -> str:
+    """
+    Read content from a file based on its extension.
+    
+    Args:
+        file_path: Path to the file to read
+        
+    Returns:
+        String content of the file
+    """
+    if file_path.endswith('.txt'):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read()
+            
+    elif file_path.endswith('.pdf'):
+        # Reuse previously extracted text if the file is unchanged
+        cached = load_cached_content(file_path)
+        if cached is not None:
+            return cached
+        
+        # Read PDF files using pypdfium2, falling back to pdfplumber and then PyPDF2
+        content = None
+        if pdfium is None:
+            logger.warning("pypdfium2 not available, using pdfplumber")
+        else:
+            try:
+                content = _read_pdf_with_pdfium(file_path)
+            except Exception as e:
+                logger.warning(f"pypdfium2 failed to read {file_path}, using pdfplumber: {e}")
+        
+        if content is None:
+            if pdfplumber is not None:
+                with pdfplumber.open(file_path) as pdf:
+                    pages = []
+                    for page in pdf.pages:
+                        page_text = page.extract_text()
+                        if page_text:
+                            pages.append(page_text)
+                    content = "\n".join(pages)
+            else:
+                logger.warning("pdfplumber not available, using PyPDF2")
+                if PyPDF2 is None:
+                    raise ImportError("No PDF library available: install pypdfium2, pdfplumber or PyPDF2")
+                with open(file_path, 'rb') as f:
+                    pdf_reader = PyPDF2.PdfReader(f)
+                    content = "\n".join(page.extract_text() for page in pdf_reader.pages)
+        
+        store_cached_content(file_path, content)
+        return content
+                
+    elif file_path.endswith('.docx'):
+        # Reuse previously extracted text if the file is unchanged
+        cached = load_cached_content(file_path)
+        if cached is not None:
+            return cached
+        
+        # Read DOCX text straight from the document XML, falling back to python-docx
+        try:
+            content = _read_docx_xml(file_path)
+        except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+            logger.warning(f"Failed to read document XML from {file_path}, using python-docx: {e}")
+            if Document is None:
+                logger.error("python-docx not available for DOCX processing")
+                return f"[DOCX content from {file_path} - python-docx not installed]"
+            doc = Document(file_path)
+            content = "\n".join(paragraph.text for paragraph in doc.paragraphs)
+        
+        store_cached_content(file_path, content)
+        return content
+            
+    else:
+        # Try to read as text file
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read()
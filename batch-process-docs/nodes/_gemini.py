@@ -0,0 +1,77 @@
+import asyncio
+import functools
+import os
+from typing import Any, Dict, List
+from google import genai
+
+# Maximum number of Gemini batch jobs submitted concurrently by this process
+GEMINI_SUBMIT_CONCURRENCY = int(os.getenv("EXO_GEMINI_CONCURRENCY", "10"))
+
+# Model used for every batch job submitted by the workflow
+GEMINI_BATCH_MODEL = "models/gemini-2.5-flash"
+
+# Shared by every node that submits batch jobs, so the limit applies process-wide
+submit_slots = asyncio.Semaphore(GEMINI_SUBMIT_CONCURRENCY)
+
+
+@functools.lru_cache(maxsize=4)
+def get_gemini_client(api_key: str) -> genai.Client:
+    """
+    Return a Gemini client for an API key, reusing it across node executions.
+    
+    Args:
+        api_key: Gemini API key
+        
+    Returns:
+        Shared genai.Client instance for the key
+    """
+    return genai.Client(api_key=api_key)
+
+
+def build_inline_requests(prompt: str, contents: List[str]) -> List[Dict[str, Any]]:
+    """
+    Build one Gemini inline request per document content.
+    
+    Args:
+        prompt: Processing prompt prepended to every document
+        contents: Document contents, in file order
+        
+    Returns:
+        Inline requests for a Gemini batch job
+    """
+    return [
+        {
+            'contents': [{
+                'parts': [{
+                    'text': f"{prompt}\n\nDocument content:\n{content}"
+                }],
+                'role': 'user'
+            }]
+        }
+        for content in contents
+    ]
+
+
+async def submit_batch(client: genai.Client, inline_requests: List[Dict[str, Any]], task_id: str) -> str:
+    """
+    Submit inline requests as a Gemini batch job.
+    
+    Args:
+        client: Gemini client to submit with
+        inline_requests: Requests built by build_inline_requests
+        task_id: Task ID used in the batch job display name
+        
+    Returns:
+        Name of the created Gemini batch job
+    """
+    # Submit asynchronously, bounded by the process-wide submission limit
+    async with submit_slots:
+        inline_batch_job = await client.aio.batches.create(
+            model=GEMINI_BATCH_MODEL,
+            src=inline_requests,
+            config={
+                'display_name': f"batch_job_{task_id}",
+            },
+        )
+    
+    return inline_batch_job.name
@@ -0,0 +1,28 @@
+# Minimum length of extracted content once surrounding whitespace is trimmed
+MIN_CONTENT_LENGTH = 10
+
+
+def content_quality_status(extracted_data) -> str:
+    """
+    Classify extracted data by the basic content quality checks.
+    
+    Args:
+        extracted_data: Extracted data parsed from the model response
+        
+    Returns:
+        "valid" if title and content are present and the content is long enough, otherwise "partial"
+    """
+    if not isinstance(extracted_data, dict):
+        return "partial"
+    
+    # Check if required fields are present and not empty
+    title = extracted_data.get("title")
+    content = extracted_data.get("content")
+    if not title or not content or not isinstance(content, str):
+        return "partial"
+    
+    # Check content quality (basic checks)
+    if len(content.strip()) < MIN_CONTENT_LENGTH:
+        return "partial"
+    
+    return "valid"
@@ -1,14 +1,18 @@
-import json
+import asyncio
 import logging
 import uuid
+import orjson
 from exospherehost import BaseNode
 from pydantic import BaseModel
-from google import genai
-from google.genai import types
+from ._file_reader import read_file_content
+from ._gemini import build_inline_requests, get_gemini_client, submit_batch
 
 # Configure logger for this node
 logger = logging.getLogger(__name__)
 
+# Maximum number of files read concurrently within a single chunk
+MAX_CONCURRENT_READS = 10
+
 
 class BatchProcessingNode(BaseNode):
 
@@ -31,9 +35,9 @@ class BatchProcessingNode(BaseNode):
         
         # Parse inputs
         try:
-            file_paths = json.loads(self.inputs.chunk)
+            file_paths = orjson.loads(self.inputs.chunk)
             logger.info(f"Processing batch with {len(file_paths)} files")
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse chunk: {e}")
             raise
         
@@ -49,78 +53,27 @@ class BatchProcessingNode(BaseNode):
             "status": "processing"
         }
         
-        # Initialize Gemini client
-        client = genai.Client(api_key=self.secrets.gemini_api_key)
+        # Reuse the shared Gemini client for this API key
+        client = get_gemini_client(self.secrets.gemini_api_key)
         
         logger.info(f"Submitting batch {task_id} to Gemini using Batch Mode")
         
-        # Read files and prepare inline requests for Gemini batch processing
-        inline_requests = []
-        for file_path in file_paths:
-            
-            # Read file content based on file type
-            if file_path.endswith('.txt'):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-            elif file_path.endswith('.pdf'):
-                # Read PDF files using pdfplumber
-                try:
-                    import pdfplumber
-                    with pdfplumber.open(file_path) as pdf:
-                        content = ""
-                        for page in pdf.pages:
-                            page_text = page.extract_text()
-                            if page_text:
-                                content += page_text + "\n"
-                except ImportError:
-                    logger.warning("pdfplumber not available, using PyPDF2")
-                    import PyPDF2
-                    with open(file_path, 'rb') as f:
-                        pdf_reader = PyPDF2.PdfReader(f)
-                        content = ""
-                        for page in pdf_reader.pages:
-                            content += page.extract_text() + "\n"
-            elif file_path.endswith('.docx'):
-                # Read DOCX files using python-docx
-                try:
-                    from docx import Document
-                    doc = Document(file_path)
-                    content = ""
-                    for paragraph in doc.paragraphs:
-                        content += paragraph.text + "\n"
-                except ImportError:
-                    logger.error("python-docx not available for DOCX processing")
-                    content = f"[DOCX content from {file_path} - python-docx not installed]"
-            else:
-                # Try to read as text file
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-            
-            # Create inline request for this file
-            request = {
-                'contents': [{
-                    'parts': [{
-                        'text': f"{self.inputs.prompt}\n\nDocument content:\n{content}"
-                    }],
-                    'role': 'user'
-                }]
-            }
-            
-            inline_requests.append(request)
+        # Read files concurrently in worker threads so the event loop stays free
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_READS)
+        
+        async def read(file_path: str) -> str:
+            async with semaphore:
+                return await asyncio.to_thread(read_file_content, file_path)
+        
+        contents = await asyncio.gather(*(read(file_path) for file_path in file_paths))
+        
+        # Prepare inline requests for Gemini batch processing
+        inline_requests = build_inline_requests(self.inputs.prompt, contents)
                 
         # Create batch job using Gemini API Batch Mode
         logger.info(f"Creating Gemini batch job with {len(inline_requests)} inline requests")
         
-        inline_batch_job = client.batches.create(
-            model="models/gemini-2.5-flash",
-            src=inline_requests,
-            config={
-                'display_name': f"batch_job_{task_id}",
-            },
-        )
-        
-        # Get the actual batch ID from Gemini
-        actual_batch_id = inline_batch_job.name
+        actual_batch_id = await submit_batch(client, inline_requests, task_id)
         logger.info(f"Successfully created Gemini batch: {actual_batch_id}")
         
         # Update batch info with actual batch ID
@@ -130,8 +83,9 @@ class BatchProcessingNode(BaseNode):
         
         print(f"Submitted batch {actual_batch_id} with {len(inline_requests)} requests for processing")
         
-        return self.Outputs(
+        # Fields are serialized here, so skip re-validating them
+        return self.Outputs.model_construct(
             task_id=actual_batch_id,  # Use actual Gemini batch ID
-            batch_info=json.dumps(batch_info)
+            batch_info=orjson.dumps(batch_info).decode()
         )
         
@@ -1,17 +1,22 @@
-import json
+import asyncio
 import logging
+import orjson
 from exospherehost import BaseNode
 from pydantic import BaseModel
-from google import genai
+from ._file_reader import load_content
+from ._gemini import build_inline_requests, get_gemini_client, submit_batch
 
 # Configure logger for this node
 logger = logging.getLogger(__name__)
 
+# Maximum number of stored contents loaded concurrently within a single batch
+MAX_CONCURRENT_READS = 10
+
 
 class BatchRequestNode(BaseNode):
 
     class Inputs(BaseModel):
-        parsed_files: str  # JSON string with parsed file contents from file_parsing node
+        parsed_files: str  # JSON string with references to parsed file contents from file_parsing node
         task_id: str  # Task ID from file_parsing node
         prompt: str  # Prompt for processing
 
@@ -30,9 +35,9 @@ class BatchRequestNode(BaseNode):
         
         # Parse inputs
         try:
-            parsed_files = json.loads(self.inputs.parsed_files)
+            parsed_files = orjson.loads(self.inputs.parsed_files)
             logger.info(f"Creating batch request for {len(parsed_files)} parsed files")
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse parsed_files: {e}")
             raise
         
@@ -44,40 +49,27 @@ class BatchRequestNode(BaseNode):
             "status": "processing"
         }
         
-        # Initialize Gemini client
-        print(f"Gemini API key: {self.secrets.gemini_api_key}")
-        client = genai.Client(api_key=self.secrets.gemini_api_key)
+        # Reuse the shared Gemini client for this API key
+        client = get_gemini_client(self.secrets.gemini_api_key)
         
         logger.info(f"Submitting batch {self.inputs.task_id} to Gemini using Batch Mode")
         
+        # Fetch the content referenced by the file_parsing node for each file, off the event loop
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_READS)
+        
+        async def load(content_ref: str) -> str:
+            async with semaphore:
+                return await asyncio.to_thread(load_content, content_ref)
+        
+        contents = await asyncio.gather(*(load(file_data['content_ref']) for file_data in parsed_files))
+        
         # Create inline requests for Gemini batch processing
-        inline_requests = []
-        for file_data in parsed_files:
-            # Create inline request for this file
-            request = {
-                'contents': [{
-                    'parts': [{
-                        'text': f"{self.inputs.prompt}\n\nDocument content:\n{file_data['content']}"
-                    }],
-                    'role': 'user'
-                }]
-            }
-            
-            inline_requests.append(request)
+        inline_requests = build_inline_requests(self.inputs.prompt, contents)
                 
         # Create batch job using Gemini API Batch Mode
         logger.info(f"Creating Gemini batch job with {len(inline_requests)} inline requests")
         
-        inline_batch_job = client.batches.create(
-            model="models/gemini-2.5-flash",
-            src=inline_requests,
-            config={
-                'display_name': f"batch_job_{self.inputs.task_id}",
-            },
-        )
-        
-        # Get the actual batch ID from Gemini
-        actual_batch_id = inline_batch_job.name
+        actual_batch_id = await submit_batch(client, inline_requests, self.inputs.task_id)
         logger.info(f"Successfully created Gemini batch: {actual_batch_id}")
         
         # Update batch info with actual batch ID
@@ -87,7 +79,8 @@ class BatchRequestNode(BaseNode):
         
         print(f"Submitted batch {actual_batch_id} with {len(inline_requests)} requests for processing")
         
-        return self.Outputs(
+        # Fields are serialized here, so skip re-validating them
+        return self.Outputs.model_construct(
             task_id=actual_batch_id,  # Use actual Gemini batch ID
-            batch_info=json.dumps(batch_info)
+            batch_info=orjson.dumps(batch_info).decode()
         )
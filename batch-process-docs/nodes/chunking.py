@@ -1,6 +1,7 @@
-import json
+import asyncio
 import logging
-import math
+import os
+import orjson
 from exospherehost import BaseNode
 from pydantic import BaseModel
 from typing import List
@@ -9,11 +10,20 @@ from typing import List
 logger = logging.getLogger(__name__)
 
 
+def _file_size(file_path: str) -> int:
+    """Return the size of a file in bytes, or 0 if it cannot be read (parsing reports the error later)."""
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+
 class ChunkingNode(BaseNode):
 
     class Inputs(BaseModel):
         file_paths: str  # JSON string representation of list of file paths
-        chunk_size: str  # Size of each chunk (default: "10")
+        chunk_size: str  # Maximum number of files per chunk (default: "10")
+        chunk_target_bytes: str  # Target total file size of each chunk in bytes (default: "2000000")
 
     class Outputs(BaseModel):
         chunk: str  # JSON string representation of a chunk of file paths
@@ -29,29 +39,31 @@ class ChunkingNode(BaseNode):
         
         # Parse JSON string to list
         try:
-            file_paths = json.loads(self.inputs.file_paths)
+            file_paths = orjson.loads(self.inputs.file_paths)
             chunk_size = int(self.inputs.chunk_size)
-            logger.info(f"Successfully parsed {len(file_paths)} file paths, chunk size: {chunk_size}")
-        except (json.JSONDecodeError, ValueError) as e:
+            chunk_target_bytes = int(self.inputs.chunk_target_bytes)
+            logger.info(f"Successfully parsed {len(file_paths)} file paths, chunk size: {chunk_size}, target bytes: {chunk_target_bytes}")
+        except (orjson.JSONDecodeError, ValueError) as e:
             logger.error(f"Failed to parse inputs: {e}")
             raise
         
-        # Create chunks
-        chunks = []
-        for i in range(0, len(file_paths), chunk_size):
-            chunk = file_paths[i:i + chunk_size]
-            chunks.append(chunk)
-        
-        logger.info(f"Created {len(chunks)} chunks")
+        # Stat the files off the event loop to size each chunk
+        sizes = await asyncio.to_thread(lambda: [_file_size(file_path) for file_path in file_paths])
         
-        # Create outputs for each chunk
+        # Greedily pack files into chunks, closing a chunk when the next file would push it
+        # past the target size or when it already holds chunk_size files
         outputs = []
-        for i, chunk in enumerate(chunks):
-            chunk_json = json.dumps(chunk)
-            outputs.append(self.Outputs(
-                chunk=chunk_json
-            ))
-            logger.info(f"Chunk {i+1}: {len(chunk)} files")
+        chunk = []
+        chunk_bytes = 0
+        for file_path, size in zip(file_paths, sizes):
+            if chunk and (len(chunk) >= chunk_size or chunk_bytes + size > chunk_target_bytes):
+                outputs.append(self.Outputs(chunk=orjson.dumps(chunk).decode()))
+                chunk = []
+                chunk_bytes = 0
+            chunk.append(file_path)
+            chunk_bytes += size
+        if chunk:
+            outputs.append(self.Outputs(chunk=orjson.dumps(chunk).decode()))
         
         logger.info(f"Successfully created {len(outputs)} chunks")
         print(f"Created {len(outputs)} chunks from {len(file_paths)} file paths")
@@ -1,6 +1,6 @@
-import json
+import csv
 import logging
-import pandas as pd
+import orjson
 from exospherehost import BaseNode
 from pydantic import BaseModel
 from typing import List
@@ -27,16 +27,15 @@ class CSVInputNode(BaseNode):
         logger.info(f"Starting CSV input processing for file: {self.inputs.csv_file_path}")
         
         try:
-            # Read CSV file
-            df = pd.read_csv(self.inputs.csv_file_path)
-            logger.info(f"Successfully read CSV with {len(df)} rows")
-            
-            # Extract file paths from first column
-            file_paths = df.iloc[:, 0].tolist()
+            # Read CSV file, extracting file paths from the first column after the header row
+            with open(self.inputs.csv_file_path, 'r', newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                file_paths = [row[0] for row in reader if row and row[0]]
             logger.info(f"Extracted {len(file_paths)} file paths")
             
             # Convert to JSON string
-            file_paths_json = json.dumps(file_paths)
+            file_paths_json = orjson.dumps(file_paths).decode()
             
             logger.info("Successfully processed CSV input")
             print(f"Read {len(file_paths)} file paths from CSV")
@@ -1,14 +1,110 @@
-import json
+import asyncio
 import logging
+from collections import OrderedDict
 from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+import orjson
 from exospherehost import BaseNode
 from pydantic import BaseModel
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import PyMongoError
+from pymongo import WriteConcern
+from pymongo.errors import BulkWriteError, PyMongoError
 
 # Configure logger for this node
 logger = logging.getLogger(__name__)
 
+# MongoDB clients shared by every execution in this process, keyed by connection string.
+# Motor pools connections internally, so one client per database URL is enough.
+_CLIENTS: Dict[str, AsyncIOMotorClient] = {}
+
+# (database_url, database, collection) combinations whose indexes are already in place
+_INDEXED: Set[Tuple[str, str, str]] = set()
+
+# Serializes first-time index creation so concurrent writers do not repeat it
+_INDEX_LOCK = asyncio.Lock()
+
+# Maximum number of tasks remembered as having their batch information stored
+RECORDED_BATCHES_SIZE = 10000
+
+# (database_url, database, task_id) combinations whose batch information is stored or being stored,
+# mapped to a future that resolves once the upsert finishes; least recently used entries are evicted
+_RECORDED_BATCHES: "OrderedDict[Tuple[str, str, str], asyncio.Future]" = OrderedDict()
+
+# Collection holding the batch information of each task, referenced from documents by task_id
+BATCHES_COLLECTION = "batches"
+
+# Fields indexed on the processed documents collection
+INDEXED_FIELDS = ["task_id", "file_path", "processing_status", "created_at"]
+
+# Maximum number of documents sent to MongoDB in a single insert_many call
+WRITE_BATCH_SIZE = 100
+
+# Seconds to wait for concurrent writes to join a partially filled batch
+WRITE_BATCH_WAIT = 0.05
+
+
+class _BatchWriter:
+    """Coalesces concurrent single-document inserts into unordered insert_many calls."""
+
+    def __init__(self, collection):
+        self._collection = collection
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def insert(self, document: dict) -> None:
+        """Queue a document and wait until the batch containing it has been written."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((document, future))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        await future
+
+    async def _run(self):
+        """Drain the queue forever, flushing up to WRITE_BATCH_SIZE documents at a time."""
+        while True:
+            batch = [await self._queue.get()]
+            if self._queue.qsize() < WRITE_BATCH_SIZE - 1:
+                await asyncio.sleep(WRITE_BATCH_WAIT)
+            while len(batch) < WRITE_BATCH_SIZE and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[tuple]):
+        """Write one batch and resolve the future of every document in it."""
+        failed = {}
+        try:
+            await self._collection.insert_many([document for document, _ in batch], ordered=False)
+        except BulkWriteError as e:
+            # Unordered inserts still write every document that did not error
+            failed = {error["index"]: error for error in e.details.get("writeErrors", [])}
+        except Exception as e:
+            logger.error(f"Failed to insert batch of {len(batch)} documents: {e}")
+            failed = {index: e for index in range(len(batch))}
+        
+        for index, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            error = failed.get(index)
+            if error is None:
+                future.set_result(None)
+            elif isinstance(error, Exception):
+                future.set_exception(error)
+            else:
+                future.set_exception(PyMongoError(error.get("errmsg", "Failed to insert document")))
+
+
+# Batch writers shared by every execution in this process, keyed like _INDEXED
+_WRITERS: Dict[Tuple[str, str, str], _BatchWriter] = {}
+
+
+def _get_client(database_url: str) -> AsyncIOMotorClient:
+    """Return the shared MongoDB client for a connection string, creating it on first use."""
+    client = _CLIENTS.get(database_url)
+    if client is None:
+        client = AsyncIOMotorClient(database_url, maxPoolSize=50)
+        _CLIENTS[database_url] = client
+    return client
+
 
 class DatabaseWriteNode(BaseNode):
 
@@ -35,36 +131,49 @@ class DatabaseWriteNode(BaseNode):
         
         # Parse inputs
         try:
-            validated_data = json.loads(self.inputs.validated_data)
-            batch_info = json.loads(self.inputs.batch_info)
+            validated_data = orjson.loads(self.inputs.validated_data)
+            batch_info = orjson.loads(self.inputs.batch_info)
             logger.info(f"Writing individual result for task {validated_data.get('task_id', 'unknown')}, file: {validated_data.get('file_path', 'unknown')}")
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse inputs: {e}")
             raise
         
         try:
-            # Create MongoDB client
-            client = AsyncIOMotorClient(self.secrets.database_url)
+            # Reuse the shared MongoDB client
+            client = _get_client(self.secrets.database_url)
             db = client[database_name]
-            collection = db[collection_name]
+            # Primary acknowledgement is enough; failed writes are logged and reported downstream
+            collection = db.get_collection(collection_name, write_concern=WriteConcern(w=1))
+            
+            # Ensure collection exists and create indexes once per process
+            collection_key = (self.secrets.database_url, database_name, collection_name)
+            if collection_key not in _INDEXED:
+                async with _INDEX_LOCK:
+                    if collection_key not in _INDEXED:
+                        await self._ensure_collection_exists(collection)
+                        _INDEXED.add(collection_key)
             
-            # Ensure collection exists and create indexes
-            await self._ensure_collection_exists(collection)
+            # Route the insert through the shared batch writer for this collection
+            writer = _WRITERS.get(collection_key)
+            if writer is None:
+                writer = _BatchWriter(collection)
+                _WRITERS[collection_key] = writer
+            
+            # Store the batch information once per task instead of in every document
+            task_id = validated_data.get("task_id", "unknown")
+            await self._record_batch(db, (self.secrets.database_url, database_name, task_id), batch_info)
             
             # Write individual validated result to database
             record_count = 0
             write_status = "success"
             
             try:
-                await self._write_record(collection, validated_data, batch_info)
+                await self._write_record(writer, validated_data)
                 record_count = 1
                 logger.info(f"Successfully wrote record for file: {validated_data.get('file_path', 'unknown')}")
             except Exception as e:
                 logger.error(f"Failed to write record for file {validated_data.get('file_path', 'unknown')}: {e}")
                 write_status = "failed"
-            finally:
-                # Close the MongoDB client
-                client.close()
             
             logger.info(f"Database write completed: {record_count} records written")
             print(f"Database write status: {write_status}, Records written: {record_count}")
@@ -81,18 +190,49 @@ class DatabaseWriteNode(BaseNode):
     async def _ensure_collection_exists(self, collection):
         """Ensure the collection exists and create indexes."""
         try:
-            # Create indexes for better query performance
-            await collection.create_index("task_id")
-            await collection.create_index("file_path")
-            await collection.create_index("processing_status")
-            await collection.create_index("created_at")
+            # Create indexes for better query performance, in parallel
+            await asyncio.gather(*(collection.create_index(field) for field in INDEXED_FIELDS))
             logger.info("Ensured collection exists with proper indexes")
         except PyMongoError as e:
             logger.error(f"Failed to create collection indexes: {e}")
             raise
     
-    async def _write_record(self, collection, validated_data: dict, batch_info: dict):
-        """Write a single record to the MongoDB collection."""
+    async def _record_batch(self, db, batch_key: Tuple[str, str, str], batch_info: dict):
+        """Upsert the batch information of a task into the batches collection, once per process."""
+        recorded = _RECORDED_BATCHES.get(batch_key)
+        if recorded is not None:
+            # Wait for the upsert started by another writer for the same task to finish
+            _RECORDED_BATCHES.move_to_end(batch_key)
+            await asyncio.shield(recorded)
+            return
+        
+        # Register before awaiting so concurrent writers for the same task wait on this upsert
+        recorded = asyncio.get_running_loop().create_future()
+        _RECORDED_BATCHES[batch_key] = recorded
+        while len(_RECORDED_BATCHES) > RECORDED_BATCHES_SIZE:
+            _RECORDED_BATCHES.popitem(last=False)
+        
+        task_id = batch_key[2]
+        stored = False
+        try:
+            batches = db.get_collection(BATCHES_COLLECTION, write_concern=WriteConcern(w=1))
+            await batches.update_one(
+                {"_id": task_id},
+                {"$setOnInsert": {"batch_info": batch_info, "created_at": datetime.now()}},
+                upsert=True
+            )
+            stored = True
+            logger.info(f"Stored batch information for task {task_id}")
+        except PyMongoError as e:
+            logger.error(f"Failed to store batch information for task {task_id}: {e}")
+        finally:
+            # Let a later write for this task retry if the upsert did not complete
+            if not stored and _RECORDED_BATCHES.get(batch_key) is recorded:
+                del _RECORDED_BATCHES[batch_key]
+            recorded.set_result(None)
+    
+    async def _write_record(self, writer: _BatchWriter, validated_data: dict):
+        """Write a single record to the MongoDB collection through the batch writer."""
         current_time = datetime.now()
         
         # Create document for MongoDB
@@ -102,13 +242,12 @@ class DatabaseWriteNode(BaseNode):
             "extracted_data": validated_data.get("extracted_data", {}),
             "processing_status": validated_data.get("validation_status", "completed"),
             "created_at": current_time,
-            "updated_at": current_time,
-            "batch_info": batch_info
+            "updated_at": current_time
         }
         
         try:
-            result = await collection.insert_one(document)
-            logger.info(f"Inserted document with ID: {result.inserted_id}")
+            await writer.insert(document)
+            logger.info(f"Inserted document with ID: {document.get('_id')}")
         except PyMongoError as e:
             logger.error(f"Failed to insert document: {e}")
             raise
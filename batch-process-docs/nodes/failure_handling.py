@@ -1,14 +1,33 @@
-import json
+import asyncio
 import logging
 import csv
 import os
 from datetime import datetime
+import orjson
 from exospherehost import BaseNode
 from pydantic import BaseModel
 
 # Configure logger for this node
 logger = logging.getLogger(__name__)
 
+# Serializes appends to the shared daily failure CSV within this process
+_FAILURE_CSV_LOCK = asyncio.Lock()
+
+# Header row of the failure CSV
+FAILURE_CSV_HEADER = ['file_path', 'failure_reason', 'task_id', 'timestamp']
+
+
+def _write_csv_sync(path: str, row: list) -> None:
+    """Append one row to a failure CSV, writing the header first if the file is new."""
+    with open(path, 'a', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        
+        # Write header only when the file is new
+        if csvfile.tell() == 0:
+            writer.writerow(FAILURE_CSV_HEADER)
+        
+        writer.writerow(row)
+
 
 class FailureHandlingNode(BaseNode):
 
@@ -32,10 +51,10 @@ class FailureHandlingNode(BaseNode):
         
         # Parse inputs
         try:
-            batch_info = json.loads(self.inputs.batch_info)
-            validated_data = json.loads(self.inputs.validated_data)
+            batch_info = orjson.loads(self.inputs.batch_info)
+            validated_data = orjson.loads(self.inputs.validated_data)
             logger.info(f"Handling failures for task {validated_data.get('task_id', 'unknown')}, file: {validated_data.get('file_path', 'unknown')}")
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse inputs: {e}")
             raise
         
@@ -67,43 +86,39 @@ class FailureHandlingNode(BaseNode):
             raise
     
     async def _create_failure_csv(self, batch_info: dict, validated_data: dict) -> str:
-        """Create a CSV file with failed file path for retry."""
+        """Append the failed file path to the daily failure CSV for retry."""
         
         # Create failures directory if it doesn't exist
         failures_dir = "failures"
-        os.makedirs(failures_dir, exist_ok=True)
+        await asyncio.to_thread(os.makedirs, failures_dir, exist_ok=True)
         
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        task_id = validated_data.get("task_id", "unknown")
-        filename = f"failures_{task_id}_{timestamp}.csv"
+        # All failures of a day go to a single file
+        filename = f"failures_{datetime.now():%Y%m%d}.csv"
         file_path = os.path.join(failures_dir, filename)
+        task_id = validated_data.get("task_id", "unknown")
         
         # Get the failed file path
         failed_file_path = validated_data.get("file_path", "")
         failure_reason = await self._get_failure_reason(validated_data)
         
-        # Write failure CSV
+        # Append to failure CSV
         try:
-            with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                
-                # Write header
-                writer.writerow(['file_path', 'failure_reason', 'task_id', 'timestamp'])
-                
-                # Write failed file
-                writer.writerow([
-                    failed_file_path,
-                    failure_reason,
-                    task_id,
-                    datetime.now().isoformat()
-                ])
+            row = [
+                failed_file_path,
+                failure_reason,
+                task_id,
+                datetime.now().isoformat()
+            ]
+            
+            # Write off the event loop; the lock keeps concurrent appends from interleaving
+            async with _FAILURE_CSV_LOCK:
+                await asyncio.to_thread(_write_csv_sync, file_path, row)
             
-            logger.info(f"Created failure CSV: {file_path} with 1 failed file")
+            logger.info(f"Appended failed file to failure CSV: {file_path}")
             return file_path
             
         except Exception as e:
-            logger.error(f"Failed to create failure CSV: {e}")
+            logger.error(f"Failed to write failure CSV: {e}")
             raise
     
     async def _get_failure_reason(self, validated_data: dict) -> str:
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import uuid
+import orjson
+from exospherehost import BaseNode
+from pydantic import BaseModel
+from ._file_reader import read_file_content
+from ._gemini import build_inline_requests, get_gemini_client, submit_batch
+
+# Configure logger for this node
+logger = logging.getLogger(__name__)
+
+# Maximum number of files read concurrently within a single chunk
+MAX_CONCURRENT_READS = 10
+
+
+class FileParseAndRequestNode(BaseNode):
+
+    class Inputs(BaseModel):
+        chunk: str  # JSON string representation of chunk of file paths
+        prompt: str  # Prompt for processing
+
+    class Outputs(BaseModel):
+        task_id: str  # Unique task ID for tracking
+        batch_info: str  # JSON string with batch information
+
+    class Secrets(BaseModel):
+        gemini_api_key: str
+
+    async def execute(self) -> Outputs:
+        """
+        Parse a chunk of files and submit their contents as a single Gemini batch request.
+        
+        Combines FileParsingNode and BatchRequestNode so the extracted text goes
+        straight into the inline requests instead of round-tripping through the
+        state manager between the two steps.
+        """
+        logger.info("Starting file parsing and batch request creation")
+        
+        # Parse inputs
+        try:
+            file_paths = orjson.loads(self.inputs.chunk)
+            logger.info(f"Parsing {len(file_paths)} files for batch request")
+        except orjson.JSONDecodeError as e:
+            logger.error(f"Failed to parse chunk: {e}")
+            raise
+        
+        # Generate unique task ID
+        task_id = str(uuid.uuid4())
+        
+        # Parse files concurrently, offloading the blocking reads to worker threads
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_READS)
+        
+        async def parse(file_path: str) -> str:
+            async with semaphore:
+                return await asyncio.to_thread(self._safe_read, file_path)
+        
+        contents = await asyncio.gather(*(parse(file_path) for file_path in file_paths))
+        
+        logger.info(f"Successfully parsed {len(contents)} files")
+        
+        # Create batch info
+        batch_info = {
+            "task_id": task_id,
+            "file_count": len(file_paths),
+            "file_paths": file_paths,
+            "status": "processing"
+        }
+        
+        # Reuse the shared Gemini client for this API key
+        client = get_gemini_client(self.secrets.gemini_api_key)
+        
+        logger.info(f"Submitting batch {task_id} to Gemini using Batch Mode")
+        
+        # Create inline requests for Gemini batch processing
+        inline_requests = build_inline_requests(self.inputs.prompt, contents)
+        
+        # Create batch job using Gemini API Batch Mode
+        logger.info(f"Creating Gemini batch job with {len(inline_requests)} inline requests")
+        
+        actual_batch_id = await submit_batch(client, inline_requests, task_id)
+        logger.info(f"Successfully created Gemini batch: {actual_batch_id}")
+        
+        # Update batch info with actual batch ID
+        batch_info["gemini_batch_id"] = actual_batch_id
+        batch_info["request_count"] = len(inline_requests)
+        batch_info["status"] = "submitted"
+        
+        # Fields are serialized here, so skip re-validating them
+        return self.Outputs.model_construct(
+            task_id=actual_batch_id,  # Use actual Gemini batch ID
+            batch_info=orjson.dumps(batch_info).decode()
+        )
+    
+    def _safe_read(self, file_path: str) -> str:
+        """
+        Read a single file, returning an error marker instead of raising.
+        
+        Args:
+            file_path: Path to the file to read
+        
+        Returns:
+            File content, or an error description if the file could not be read
+        """
+        try:
+            content = read_file_content(file_path)
+            logger.debug("Successfully parsed file: %s", file_path)
+            return content
+        except Exception as e:
+            logger.error(f"Failed to parse file {file_path}: {e}")
+            # Keep the request so results stay aligned with file_paths
+            return f"[ERROR: Failed to read file - {str(e)}]"
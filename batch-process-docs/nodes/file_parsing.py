@@ -1,12 +1,17 @@
-import json
+import asyncio
 import logging
+import uuid
+import orjson
 from exospherehost import BaseNode
 from pydantic import BaseModel
 from typing import List, Dict, Any
+from ._file_reader import read_file_content, store_content
 
 # Configure logger for this node
 logger = logging.getLogger(__name__)
 
+# Maximum number of files read concurrently within a single chunk
+MAX_CONCURRENT_READS = 10
 
 class FileParsingNode(BaseNode):
 
@@ -14,7 +19,7 @@ class FileParsingNode(BaseNode):
         chunk: str  # JSON string representation of chunk of file paths
 
     class Outputs(BaseModel):
-        parsed_files: str  # JSON string with parsed file contents
+        parsed_files: str  # JSON string with references to parsed file contents
         task_id: str  # Unique task ID for tracking
 
     async def execute(self) -> Outputs:
@@ -25,91 +30,54 @@ class FileParsingNode(BaseNode):
         
         # Parse inputs
         try:
-            file_paths = json.loads(self.inputs.chunk)
+            file_paths = orjson.loads(self.inputs.chunk)
             logger.info(f"Parsing {len(file_paths)} files")
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse chunk: {e}")
             raise
         
         # Generate unique task ID
-        import uuid
         task_id = str(uuid.uuid4())
         
-        # Parse files and extract content
-        parsed_files = []
-        for file_path in file_paths:
-            try:
-                content = self._read_file_content(file_path)
-                parsed_files.append({
-                    "file_path": file_path,
-                    "content": content
-                })
-                logger.debug(f"Successfully parsed file: {file_path}")
-            except Exception as e:
-                logger.error(f"Failed to parse file {file_path}: {e}")
-                # Add error information but continue processing other files
-                parsed_files.append({
-                    "file_path": file_path,
-                    "content": f"[ERROR: Failed to read file - {str(e)}]",
-                    "error": str(e)
-                })
+        # Parse files concurrently, offloading the blocking reads to worker threads
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_READS)
+
+        async def parse(file_path: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await asyncio.to_thread(self._safe_read, file_path)
+
+        parsed_files = await asyncio.gather(*(parse(file_path) for file_path in file_paths))
         
         logger.info(f"Successfully parsed {len(parsed_files)} files")
         
-        return self.Outputs(
+        # Fields are serialized here, so skip re-validating them
+        return self.Outputs.model_construct(
             task_id=task_id,
-            parsed_files=json.dumps(parsed_files)
+            parsed_files=orjson.dumps(parsed_files).decode()
         )
     
-    def _read_file_content(self, file_path: str) -> str:
+    def _safe_read(self, file_path: str) -> Dict[str, Any]:
         """
-        Read content from a file based on its extension.
+        Read a single file into the content store, capturing any error in the returned entry.
         
         Args:
             file_path: Path to the file to read
             
         Returns:
-            String content of the file
+            Dictionary with the file path and a reference to its content (or error details)
         """
-        if file_path.endswith('.txt'):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
-                
-        elif file_path.endswith('.pdf'):
-            # Read PDF files using pdfplumber
-            try:
-                import pdfplumber
-                with pdfplumber.open(file_path) as pdf:
-                    content = ""
-                    for page in pdf.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            content += page_text + "\n"
-                    return content
-            except ImportError:
-                logger.warning("pdfplumber not available, using PyPDF2")
-                import PyPDF2
-                with open(file_path, 'rb') as f:
-                    pdf_reader = PyPDF2.PdfReader(f)
-                    content = ""
-                    for page in pdf_reader.pages:
-                        content += page.extract_text() + "\n"
-                    return content
-                    
-        elif file_path.endswith('.docx'):
-            # Read DOCX files using python-docx
-            try:
-                from docx import Document
-                doc = Document(file_path)
-                content = ""
-                for paragraph in doc.paragraphs:
-                    content += paragraph.text + "\n"
-                return content
-            except ImportError:
-                logger.error("python-docx not available for DOCX processing")
-                return f"[DOCX content from {file_path} - python-docx not installed]"
-                
-        else:
-            # Try to read as text file
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
+        try:
+            content = read_file_content(file_path)
+            logger.debug("Successfully parsed file: %s", file_path)
+            return {
+                "file_path": file_path,
+                "content_ref": store_content(content)
+            }
+        except Exception as e:
+            logger.error(f"Failed to parse file {file_path}: {e}")
+            # Add error information but continue processing other files
+            return {
+                "file_path": file_path,
+                "content_ref": store_content(f"[ERROR: Failed to read file - {str(e)}]"),
+                "error": str(e)
+            }
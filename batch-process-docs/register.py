@@ -11,6 +11,7 @@ from nodes.database_write import DatabaseWriteNode
 from nodes.failure_handling import FailureHandlingNode
 from nodes.file_parsing import FileParsingNode
 from nodes.batch_request import BatchRequestNode
+from nodes.file_parse_and_request import FileParseAndRequestNode
 from logging_config import setup_logging
 
 # Set up logging
@@ -37,6 +38,7 @@ Runtime(
         BatchProcessingNode,
         FileParsingNode,
         BatchRequestNode,
+        FileParseAndRequestNode,
         PollingNode,
         SplitResultsNode,
         ValidationNode,
@@ -20,6 +20,8 @@ EXOSPHERE_API_KEY = os.getenv("EXOSPHERE_API_KEY", "exosphere@123")  # TODO: Rep
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "{{GEMINI_API_KEY}}")
 DATABASE_URL = os.getenv("MONGODB_CONNECTION_STRING", "{{DATABASE_URL}}")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "sync_processed_docs")
+# Set to "true" to upsert results by task_id instead of inserting them (slower; only needed when task IDs repeat)
+MONGODB_UPSERT_MODE = os.getenv("MONGODB_UPSERT_MODE", "false")
 
 async def create_graph():
     """Create a graph with sync document processing nodes using Exosphere Python SDK"""
@@ -83,7 +85,8 @@ async def create_graph():
             identifier="failure_handling",
             inputs={
                 "validated_result": "${{ validation.outputs.validated_result }}",
-                "file_info": "${{ validation.outputs.file_info }}"
+                "file_info": "${{ validation.outputs.file_info }}",
+                "status": "${{ validation.outputs.status }}"
             },
             next_nodes=[]
         )
@@ -110,7 +113,8 @@ async def create_graph():
         secrets={
             "gemini_api_key": GEMINI_API_KEY,
             "mongodb_connection_string": DATABASE_URL,
-            "database_name": DATABASE_NAME
+            "database_name": DATABASE_NAME,
+            "upsert_mode": MONGODB_UPSERT_MODE
         },
         retry_policy=retry_policy,
         store_config=store_config
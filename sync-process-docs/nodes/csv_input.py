@@ -1,5 +1,5 @@
-import json
 import logging
+import orjson
 import pandas as pd
 from exospherehost import BaseNode
 from pydantic import BaseModel
@@ -36,10 +36,9 @@ class CSVInputNode(BaseNode):
             logger.info(f"Extracted {len(file_paths)} file paths")
             
             # Convert to JSON string
-            file_paths_json = json.dumps(file_paths)
+            file_paths_json = orjson.dumps(file_paths).decode()
             
             logger.info("Successfully processed CSV input")
-            print(f"Read {len(file_paths)} file paths from CSV")
             
             return self.Outputs(
                 file_paths=file_paths_json
@@ -1,14 +1,115 @@
-import json
+import asyncio
+import atexit
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+import orjson
 from exospherehost import BaseNode
 from pydantic import BaseModel
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import PyMongoError
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
 
 # Configure logger for this node
 logger = logging.getLogger(__name__)
 
+# MongoDB clients shared by every execution in this process, keyed by connection string and event loop.
+# Motor clients are bound to the loop they are first used on, so each loop gets its own client.
+_CLIENTS: Dict[Tuple[str, int], AsyncIOMotorClient] = {}
+
+
+def _get_client(connection_string: str) -> AsyncIOMotorClient:
+    """Return the shared MongoDB client for a connection string on the running loop, creating it on first use."""
+    key = (connection_string, id(asyncio.get_running_loop()))
+    client = _CLIENTS.get(key)
+    if client is None:
+        client = AsyncIOMotorClient(connection_string)
+        _CLIENTS[key] = client
+    return client
+
+
+# (connection string, event loop id, database, collection) combinations whose task_id index is in place
+_INDEXED: Set[Tuple[str, int, str, str]] = set()
+
+# Serializes first-time index creation so concurrent writers do not repeat it
+_INDEX_LOCK = asyncio.Lock()
+
+# MongoDB error code for a unique index violation
+DUPLICATE_KEY_ERROR = 11000
+
+# Maximum number of operations sent to MongoDB in a single bulk_write call
+WRITE_BATCH_SIZE = 500
+
+# Seconds to wait for concurrent writes to join a partially filled batch
+WRITE_BATCH_WAIT = 0.05
+
+
+class _BulkWriter:
+    """Coalesces concurrent single-document writes into unordered bulk_write calls."""
+
+    def __init__(self, collection):
+        self._collection = collection
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def write(self, operation) -> None:
+        """Queue a write operation and wait until the batch containing it has been written."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((operation, future))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        await future
+
+    async def _run(self):
+        """Drain the queue forever, flushing up to WRITE_BATCH_SIZE operations at a time."""
+        while True:
+            batch = [await self._queue.get()]
+            if self._queue.qsize() < WRITE_BATCH_SIZE - 1:
+                await asyncio.sleep(WRITE_BATCH_WAIT)
+            while len(batch) < WRITE_BATCH_SIZE and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[tuple]):
+        """Write one batch and resolve the future of every operation in it."""
+        failed = {}
+        try:
+            await self._collection.bulk_write([operation for operation, _ in batch], ordered=False)
+        except BulkWriteError as e:
+            # Unordered bulk writes still apply every operation that did not error. An insert
+            # that hits the unique task_id index was already written by an earlier attempt.
+            failed = {
+                error["index"]: error
+                for error in e.details.get("writeErrors", [])
+                if not (error.get("code") == DUPLICATE_KEY_ERROR and isinstance(batch[error["index"]][0], InsertOne))
+            }
+        except Exception as e:
+            logger.error(f"Failed to write batch of {len(batch)} operations: {e}")
+            failed = {index: e for index in range(len(batch))}
+        
+        for index, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            error = failed.get(index)
+            if error is None:
+                future.set_result(None)
+            elif isinstance(error, Exception):
+                future.set_exception(error)
+            else:
+                future.set_exception(PyMongoError(error.get("errmsg", "Failed to write document")))
+
+
+# Bulk writers shared by every execution in this process, keyed by client key, database and collection
+_WRITERS: Dict[Tuple[str, int, str, str], _BulkWriter] = {}
+
+
+@atexit.register
+def _close_clients():
+    """Close every pooled MongoDB client when the process exits."""
+    for client in _CLIENTS.values():
+        client.close()
+    _CLIENTS.clear()
+
 
 class DatabaseWriteNode(BaseNode):
 
@@ -22,6 +123,7 @@ class DatabaseWriteNode(BaseNode):
     class Secrets(BaseModel):
         mongodb_connection_string: str
         database_name: str = "sync_processed_docs"
+        upsert_mode: str = "false"  # "true" to upsert by task_id instead of inserting new documents
 
     async def execute(self) -> Outputs:
         """
@@ -29,20 +131,30 @@ class DatabaseWriteNode(BaseNode):
         """
         logger.info("Starting database write operation")
         
-        # Parse inputs
+        # Parse inputs; file_info is not needed here, so it is left unparsed
         try:
-            validated_result = json.loads(self.inputs.validated_result)
-            file_info = json.loads(self.inputs.file_info)
-            logger.info(f"Writing result for file: {validated_result.get('file_path', 'unknown')}")
-        except json.JSONDecodeError as e:
+            validated_result = orjson.loads(self.inputs.validated_result)
+            logger.info("Writing result for file: %s", validated_result.get('file_path', 'unknown'))
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse inputs: {e}")
             raise
         
         
-        # Create MongoDB client
-        client = AsyncIOMotorClient(self.secrets.mongodb_connection_string)
-        db = client[self.secrets.database_name]
-        collection = db.sync_processed_documents
+        # Reuse the shared MongoDB client and the bulk writer for its collection
+        client = _get_client(self.secrets.mongodb_connection_string)
+        collection = client[self.secrets.database_name].sync_processed_documents
+        writer_key = (self.secrets.mongodb_connection_string, id(asyncio.get_running_loop()), self.secrets.database_name, "sync_processed_documents")
+        writer = _WRITERS.get(writer_key)
+        if writer is None:
+            writer = _BulkWriter(collection)
+            _WRITERS[writer_key] = writer
+        
+        # Index task_id once per process; it backs both the upsert filter and duplicate detection
+        if writer_key not in _INDEXED:
+            async with _INDEX_LOCK:
+                if writer_key not in _INDEXED:
+                    await self._ensure_indexes(collection)
+                    _INDEXED.add(writer_key)
         
         # Prepare data for insertion
         file_path = validated_result.get("file_path", "")
@@ -51,6 +163,13 @@ class DatabaseWriteNode(BaseNode):
         extracted_data = validated_result.get("extracted_data", {})
         usage_metadata = validated_result.get("usage_metadata", {})
         validation_timestamp = validated_result.get("validation_timestamp", "")
+        now = datetime.now(timezone.utc)
+        
+        # Store the ISO timestamp from the JSON payload as a native BSON date
+        try:
+            validation_timestamp = datetime.fromisoformat(validation_timestamp)
+        except (TypeError, ValueError):
+            logger.warning("Keeping unparseable validation timestamp as given: %r", validation_timestamp)
         
         # Create document for MongoDB
         document = {
@@ -60,26 +179,40 @@ class DatabaseWriteNode(BaseNode):
             "extracted_data": extracted_data,  # MongoDB stores JSON natively
             "usage_metadata": usage_metadata,  # MongoDB stores JSON natively
             "validation_timestamp": validation_timestamp,
-            "updated_at": datetime.utcnow()
+            "updated_at": now
         }
         
-        # Perform upsert operation (insert or update)
-        result = await collection.update_one(
-            {"task_id": task_id},  # Filter by task_id
-            {
-                "$set": document,
-                "$setOnInsert": {"created_at": datetime.utcnow()}  # Only set on insert
-            },
-            upsert=True  # Insert if not found, update if found
-        )
+        if self.secrets.upsert_mode.lower() == "true":
+            # Perform upsert operation (insert or update), batched with concurrent writes
+            operation = UpdateOne(
+                {"task_id": task_id},  # Filter by task_id
+                {
+                    "$set": document,
+                    "$setOnInsert": {"created_at": now}  # Only set on insert
+                },
+                upsert=True  # Insert if not found, update if found
+            )
+        else:
+            # Task IDs are new on every run, so a plain insert skips the upsert's existence check;
+            # a retried write is caught by the unique task_id index
+            document["created_at"] = now
+            operation = InsertOne(document)
         
-        # Close the client connection
-        client.close()
+        await writer.write(operation)
             
-        logger.info(f"Successfully wrote result to MongoDB for file: {file_path}")
-        print(f"Wrote result to MongoDB for file: {file_path}")
+        logger.info("Successfully wrote result to MongoDB for file: %s", file_path)
         
-        return self.Outputs(
+        # Status is a fixed string, so skip validating it
+        return self.Outputs.model_construct(
             write_status="success"
         )
+    
+    async def _ensure_indexes(self, collection):
+        """Create the unique task_id index on the documents collection."""
+        try:
+            await collection.create_index("task_id", unique=True)
+            logger.info("Ensured unique task_id index on processed documents collection")
+        except PyMongoError as e:
+            logger.error(f"Failed to create collection indexes: {e}")
+            raise
 
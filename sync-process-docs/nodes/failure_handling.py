@@ -1,20 +1,79 @@
-import json
+import asyncio
+import io
 import logging
 import os
+import re
 import csv
 from datetime import datetime
+import orjson
 from exospherehost import BaseNode
 from pydantic import BaseModel
 
 # Configure logger for this node
 logger = logging.getLogger(__name__)
 
+# Directory holding the failure CSV
+FAILURES_DIR = "failures"
+
+# Header row of the failure CSV
+FAILURE_CSV_HEADER = ['file_path', 'task_id', 'error', 'timestamp']
+
+# Header line as csv.writer would produce it, built once
+_FAILURE_CSV_HEADER_LINE = ",".join(FAILURE_CSV_HEADER) + "\r\n"
+
+# Characters that force csv.writer to quote a field
+_CSV_SPECIAL = re.compile(r'[,"\r\n]')
+
+# Whether FAILURES_DIR has been created by this process
+_failures_dir_ready = False
+
+# Serializes appends to the shared failure CSV within this process
+_FAILURE_CSV_LOCK = asyncio.Lock()
+
+
+def _get_failure_csv_path() -> str:
+    """Return today's failure CSV, creating its directory on the first failure."""
+    global _failures_dir_ready
+    if not _failures_dir_ready:
+        os.makedirs(FAILURES_DIR, exist_ok=True)
+        _failures_dir_ready = True
+    # One file per day, so a long-running worker does not keep appending to the same file
+    return os.path.join(FAILURES_DIR, f"failed_files_{datetime.now():%Y%m%d}.csv")
+
+
+def _format_csv_row(row: list) -> str:
+    """Format a row exactly as csv.writer would, joining it directly when no field needs quoting."""
+    if all(isinstance(value, str) and not _CSV_SPECIAL.search(value) for value in row):
+        return ",".join(row) + "\r\n"
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(row)
+    return buffer.getvalue()
+
+
+def _write_csv_sync(row: list) -> str:
+    """Append one row to the failure CSV, writing the header first if the file is new, and return its path."""
+    path = _get_failure_csv_path()
+    line = _format_csv_row(row)
+    try:
+        csvfile = open(path, 'a', newline='', encoding='utf-8')
+    except FileNotFoundError:
+        # The directory was removed or rotated after it was first created
+        os.makedirs(FAILURES_DIR, exist_ok=True)
+        csvfile = open(path, 'a', newline='', encoding='utf-8')
+    with csvfile:
+        # Write header only when the file is new
+        if csvfile.tell() == 0:
+            line = _FAILURE_CSV_HEADER_LINE + line
+        csvfile.write(line)
+    return path
+
 
 class FailureHandlingNode(BaseNode):
 
     class Inputs(BaseModel):
         validated_result: str  # JSON string with validated result
         file_info: str  # JSON string with file information
+        status: str  # Processing status of the file from the validation node
 
     class Outputs(BaseModel):
         failure_status: str  # Status of failure handling
@@ -28,51 +87,39 @@ class FailureHandlingNode(BaseNode):
         """
         logger.info("Starting failure handling process")
         
-        # Parse inputs
+        # Successful files need no handling, so only failures pay for parsing the result
+        if self.inputs.status != "failed":
+            logger.info("File processed successfully, no failure handling needed")
+            # Status is a fixed string, so skip validating it
+            return self.Outputs.model_construct(
+                failure_status="no_failure"
+            )
+        
+        # Parse inputs; file_info is not needed here, so it is left unparsed
         try:
-            validated_result = json.loads(self.inputs.validated_result)
-            file_info = json.loads(self.inputs.file_info)
-            logger.info(f"Checking failure status for file: {validated_result.get('file_path', 'unknown')}")
-        except json.JSONDecodeError as e:
+            validated_result = orjson.loads(self.inputs.validated_result)
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse inputs: {e}")
             raise
         
-        status = validated_result.get("status", "unknown")
         file_path = validated_result.get("file_path", "")
         task_id = validated_result.get("task_id", "")
+        logger.warning(f"Handling failure for file: {file_path}")
         
-        if status == "failed":
-            logger.warning(f"Handling failure for file: {file_path}")
-            
-            # Create failures directory if it doesn't exist
-            failures_dir = "failures"
-            if not os.path.exists(failures_dir):
-                os.makedirs(failures_dir)
-            
-            # Create failure CSV file
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            failure_csv = os.path.join(failures_dir, f"failed_files_{timestamp}.csv")
-            
-            # Write failure information to CSV
-            with open(failure_csv, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(['file_path', 'task_id', 'error', 'timestamp'])
-                writer.writerow([
-                    file_path,
-                    task_id,
-                    validated_result.get("error", "Unknown error"),
-                    datetime.now().isoformat()
-                ])
-            
-            logger.info(f"Created failure CSV: {failure_csv}")
-            print(f"Created failure CSV for file: {file_path}")
-            
-            return self.Outputs(
-                failure_status="failure_logged"
-            )
-        else:
-            logger.info(f"File {file_path} processed successfully, no failure handling needed")
-            return self.Outputs(
-                failure_status="no_failure"
-            )
-
+        row = [
+            file_path,
+            task_id,
+            validated_result.get("error", "Unknown error"),
+            datetime.now().isoformat()
+        ]
+        
+        # Write off the event loop; the lock keeps concurrent appends from interleaving.
+        # The failures directory is created on the first failure and re-created if it goes missing.
+        async with _FAILURE_CSV_LOCK:
+            failure_csv = await asyncio.to_thread(_write_csv_sync, row)
+        
+        logger.info("Appended failed file to failure CSV: %s", failure_csv)
+        
+        return self.Outputs.model_construct(
+            failure_status="failure_logged"
+        )
@@ -1,5 +1,5 @@
-import json
 import logging
+import orjson
 from exospherehost import BaseNode
 from pydantic import BaseModel
 from typing import List
@@ -28,22 +28,18 @@ class FileDistributionNode(BaseNode):
         
         # Parse JSON string to list
         try:
-            file_paths = json.loads(self.inputs.file_paths)
+            file_paths = orjson.loads(self.inputs.file_paths)
             logger.info(f"Successfully parsed {len(file_paths)} file paths")
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse file paths: {e}")
             raise
         
-        # Create individual outputs for each file
-        outputs = []
-        for i, file_path in enumerate(file_paths):
-            file_path_json = json.dumps(file_path)
-            outputs.append(self.Outputs(
-                file_path=file_path_json
-            ))
-            logger.info(f"File {i+1}: {file_path}")
+        # Create individual outputs for each file; fields are serialized here, so skip re-validating them
+        outputs = [
+            self.Outputs.model_construct(file_path=orjson.dumps(file_path).decode())
+            for file_path in file_paths
+        ]
         
         logger.info(f"Successfully distributed {len(outputs)} files for individual processing")
-        print(f"Distributed {len(outputs)} files for individual processing")
         
         return outputs
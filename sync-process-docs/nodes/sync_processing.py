@@ -1,13 +1,197 @@
-import json
+import asyncio
+import hashlib
 import logging
+import multiprocessing
+import os
+import threading
+import time
 import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+from typing import Dict, List, Optional, Tuple
+import orjson
 from exospherehost import BaseNode
 from pydantic import BaseModel
 from google import genai
 
+# Optional document parsing libraries, imported once
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+try:
+    from docx import Document
+except ImportError:
+    Document = None
+
 # Configure logger for this node
 logger = logging.getLogger(__name__)
 
+# Maximum number of files read concurrently by this process
+MAX_CONCURRENT_READS = int(os.getenv("EXO_MAX_CONCURRENT_READS", "32"))
+
+# Shared by every execution, so a large fan-out does not flood the default thread pool with reads
+_read_slots = asyncio.Semaphore(MAX_CONCURRENT_READS)
+
+# PDFium is not thread-safe, even across documents, so every pdfium call in this process is serialized
+_PDFIUM_LOCK = threading.Lock()
+
+# Directory holding the extracted text of previously parsed documents, so re-runs and
+# retries over unchanged files skip PDF/DOCX parsing
+PARSE_CACHE_DIR = ".parse_cache"
+
+# Page count from which PDF text extraction is split across worker processes
+PARALLEL_PDF_MIN_PAGES = 16
+
+# Number of worker processes extracting pages of large PDFs
+PDF_WORKERS = os.cpu_count() or 1
+
+# Worker processes for large PDFs, created on first use and shared by every execution
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_PDF_POOL_LOCK = threading.Lock()
+
+# Gemini clients shared by every execution in this process, keyed by API key and event loop.
+# The async client's connection pool is bound to the loop it is first used on.
+_GENAI_CLIENTS: Dict[Tuple[str, int], genai.Client] = {}
+
+
+def _get_genai_client(api_key: str) -> genai.Client:
+    """Return the shared Gemini client for an API key on the running loop, creating it on first use."""
+    key = (api_key, id(asyncio.get_running_loop()))
+    client = _GENAI_CLIENTS.get(key)
+    if client is None:
+        client = genai.Client(api_key=api_key)
+        _GENAI_CLIENTS[key] = client
+    return client
+
+
+def _uuid7() -> uuid.UUID:
+    """Generate a time-ordered UUIDv7 (RFC 9562): 48 bits of Unix milliseconds followed by random bits."""
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), 'big')
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # Version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 9562 variant
+    return uuid.UUID(int=value)
+
+
+# Time-ordered task IDs keep MongoDB index inserts at the right edge of the B-tree.
+# uuid.uuid7 is in the standard library from Python 3.14.
+uuid7 = getattr(uuid, "uuid7", _uuid7)
+
+
+def _write_atomic(path: str, content: str) -> None:
+    """Write text to a private temp file and rename it into place so readers never see partial content."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _cache_path(file_path: str) -> str:
+    """Build the cache entry path for a file from its absolute path, mtime and size."""
+    stat = os.stat(file_path)
+    key = hashlib.blake2b(
+        f"{os.path.abspath(file_path)}:{stat.st_mtime_ns}:{stat.st_size}".encode("utf-8"),
+        digest_size=16
+    ).hexdigest()
+    return os.path.join(PARSE_CACHE_DIR, f"{key}.txt")
+
+
+def _load_cached_content(file_path: str) -> Optional[str]:
+    """Return the cached extracted text for an unchanged file, or None on a cache miss."""
+    try:
+        with open(_cache_path(file_path), 'r', encoding='utf-8', newline='') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _store_cached_content(file_path: str, content: str) -> None:
+    """Persist extracted text for a file. A failed write only costs a future re-parse."""
+    try:
+        cache_path = _cache_path(file_path)
+        os.makedirs(PARSE_CACHE_DIR, exist_ok=True)
+        _write_atomic(cache_path, content)
+    except OSError as e:
+        logger.warning(f"Failed to cache parsed content for {file_path}: {e}")
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Return the shared PDF worker pool, creating it on first use."""
+    global _pdf_pool
+    with _PDF_POOL_LOCK:
+        if _pdf_pool is None:
+            # This process already runs threads (event loop workers, database and HTTP clients),
+            # so workers are started from a clean server process instead of forking it
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS,
+                mp_context=multiprocessing.get_context(start_method)
+            )
+        return _pdf_pool
+
+
+def _reset_pdf_pool(pool: ProcessPoolExecutor) -> None:
+    """Discard a broken PDF worker pool so the next large PDF starts a fresh one."""
+    global _pdf_pool
+    with _PDF_POOL_LOCK:
+        if _pdf_pool is pool:
+            _pdf_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_pages(pdf, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) from an open PDFium document."""
+    pages = []
+    for index in range(start, stop):
+        page = pdf[index]
+        textpage = page.get_textpage()
+        pages.append(textpage.get_text_range())
+        textpage.close()
+        page.close()
+    return pages
+
+
+def _extract_pdf_pages(file_path: str, start: int, stop: int) -> List[str]:
+    """Open a PDF and extract the text of pages [start, stop). Runs in a single-threaded worker process."""
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        return _extract_pages(pdf, start, stop)
+    finally:
+        pdf.close()
+
+
+def _read_pdf_with_pdfium(file_path: str) -> str:
+    """Extract text from every page of a PDF using the C-backed PDFium engine."""
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            page_count = len(pdf)
+            if page_count < PARALLEL_PDF_MIN_PAGES or PDF_WORKERS == 1:
+                return "\n".join(_extract_pages(pdf, 0, page_count))
+        finally:
+            pdf.close()
+    
+    # Page extraction is CPU-bound, so split large documents into one page range per worker process
+    step = -(-page_count // PDF_WORKERS)
+    starts = range(0, page_count, step)
+    stops = [min(start + step, page_count) for start in starts]
+    pool = _get_pdf_pool()
+    try:
+        parts = list(pool.map(_extract_pdf_pages, repeat(file_path), starts, stops))
+    except BrokenProcessPool as e:
+        logger.warning(f"PDF worker pool failed while reading {file_path}, extracting in process: {e}")
+        _reset_pdf_pool(pool)
+        with _PDFIUM_LOCK:
+            parts = [_extract_pdf_pages(file_path, 0, page_count)]
+    return "\n".join(text for part in parts for text in part)
+
 
 class SyncProcessingNode(BaseNode):
 
@@ -30,14 +214,14 @@ class SyncProcessingNode(BaseNode):
         
         # Parse inputs
         try:
-            file_path = json.loads(self.inputs.file_path)
-            logger.info(f"Processing file: {file_path}")
-        except json.JSONDecodeError as e:
+            file_path = orjson.loads(self.inputs.file_path)
+            logger.info("Processing file: %s", file_path)
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse file path: {e}")
             raise
         
-        # Generate unique task ID
-        task_id = str(uuid.uuid4())
+        # Generate a unique, time-ordered task ID
+        task_id = str(uuid7())
         
         # Create file info
         file_info = {
@@ -47,14 +231,15 @@ class SyncProcessingNode(BaseNode):
             "status": "processing"
         }
         
-        # Initialize Gemini client
-        client = genai.Client(api_key=self.secrets.gemini_api_key)
+        # Reuse the shared Gemini client for this API key
+        client = _get_genai_client(self.secrets.gemini_api_key)
         
-        logger.info(f"Submitting file {file_path} to Gemini using real-time API")
+        logger.info("Submitting file %s to Gemini using real-time API", file_path)
         
      
-        # Read file content based on file type
-        content = self._read_file_content(file_path)
+        # Read file content based on file type, off the event loop so concurrent files overlap
+        async with _read_slots:
+            content = await asyncio.to_thread(self._read_file_content, file_path)
         
         # Create the request for Gemini real-time API
         request = {
@@ -67,8 +252,9 @@ class SyncProcessingNode(BaseNode):
         }
         
         # Send request to Gemini real-time API
-        logger.info(f"Sending real-time request for file: {file_path}")
-        response = client.models.generate_content(
+        logger.info("Sending real-time request for file: %s", file_path)
+        # Use the async API so the request does not block other files in flight
+        response = await client.aio.models.generate_content(
             model="models/gemini-2.5-flash",
             contents=request['contents']
         )
@@ -88,8 +274,7 @@ class SyncProcessingNode(BaseNode):
                 'cached_content_token_count': getattr(usage_metadata, 'cached_content_token_count', 0)
             }
             
-            logger.info(f"Successfully processed file {file_path}")
-            print(f"Processed file {file_path} with {usage_metadata.total_token_count} tokens")
+            logger.info("Successfully processed file %s with %s tokens", file_path, usage_metadata.total_token_count)
             
         else:
             logger.error(f"No response received for file {file_path}")
@@ -98,9 +283,10 @@ class SyncProcessingNode(BaseNode):
             
     
         
-        return self.Outputs(
+        # Fields are serialized here, so skip re-validating them
+        return self.Outputs.model_construct(
             task_id=task_id,
-            file_info=json.dumps(file_info)
+            file_info=orjson.dumps(file_info).decode()
         )
     
     def _read_file_content(self, file_path: str) -> str:
@@ -118,38 +304,47 @@ class SyncProcessingNode(BaseNode):
                 return f.read()
                 
         elif file_path.endswith('.pdf'):
-            # Read PDF files using pdfplumber
-            try:
-                import pdfplumber
-                with pdfplumber.open(file_path) as pdf:
-                    content = ""
-                    for page in pdf.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            content += page_text + "\n"
-                    return content
-            except ImportError:
-                logger.warning("pdfplumber not available, using PyPDF2")
-                import PyPDF2
-                with open(file_path, 'rb') as f:
-                    pdf_reader = PyPDF2.PdfReader(f)
-                    content = ""
-                    for page in pdf_reader.pages:
-                        content += page.extract_text() + "\n"
-                    return content
+            # Reuse previously extracted text if the file is unchanged
+            cached = _load_cached_content(file_path)
+            if cached is not None:
+                return cached
+            
+            # Read PDF files using pypdfium2, falling back to pypdf
+            content = None
+            if pdfium is not None:
+                try:
+                    content = _read_pdf_with_pdfium(file_path)
+                except Exception as e:
+                    if pypdf is None:
+                        raise
+                    logger.warning(f"pypdfium2 failed to read {file_path}, using pypdf: {e}")
+            elif pypdf is None:
+                raise ImportError("No PDF library available: install pypdfium2 or pypdf")
+            else:
+                logger.warning("pypdfium2 not available, using pypdf")
+            
+            if content is None:
+                pdf_reader = pypdf.PdfReader(file_path)
+                content = "\n".join(page.extract_text() or "" for page in pdf_reader.pages)
+            
+            _store_cached_content(file_path, content)
+            return content
                     
         elif file_path.endswith('.docx'):
             # Read DOCX files using python-docx
-            try:
-                from docx import Document
-                doc = Document(file_path)
-                content = ""
-                for paragraph in doc.paragraphs:
-                    content += paragraph.text + "\n"
-                return content
-            except ImportError:
+            if Document is None:
                 logger.error("python-docx not available for DOCX processing")
                 return f"[DOCX content from {file_path} - python-docx not installed]"
+            
+            # Reuse previously extracted text if the file is unchanged
+            cached = _load_cached_content(file_path)
+            if cached is not None:
+                return cached
+            
+            doc = Document(file_path)
+            content = "\n".join(paragraph.text for paragraph in doc.paragraphs)
+            _store_cached_content(file_path, content)
+            return content
                 
         else:
             # Try to read as text file
@@ -1,11 +1,16 @@
-import json
 import logging
+import re
+from datetime import datetime, timezone
+import orjson
 from exospherehost import BaseNode
 from pydantic import BaseModel
 
 # Configure logger for this node
 logger = logging.getLogger(__name__)
 
+# Matches responses whose first non-whitespace character opens a JSON object or array
+_JSON_START = re.compile(r"\s*[\[{]")
+
 
 class ValidationNode(BaseNode):
 
@@ -15,6 +20,7 @@ class ValidationNode(BaseNode):
     class Outputs(BaseModel):
         validated_result: str  # JSON string with validated result
         file_info: str  # JSON string with file information
+        status: str  # Processing status of the file ("completed" or "failed")
 
     class Secrets(BaseModel):
         pass
@@ -27,12 +33,15 @@ class ValidationNode(BaseNode):
         
         # Parse inputs
         try:
-            file_info = json.loads(self.inputs.file_info)
-            logger.info(f"Validating result for file: {file_info.get('file_path', 'unknown')}")
-        except json.JSONDecodeError as e:
+            file_info = orjson.loads(self.inputs.file_info)
+            logger.info("Validating result for file: %s", file_info.get('file_path', 'unknown'))
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse file info: {e}")
             raise
         
+        # One timestamp per validation, shared by every branch
+        validation_timestamp = datetime.now(timezone.utc).isoformat()
+        
         try:
             # Extract response content
             response_content = file_info.get("response_content", "")
@@ -47,14 +56,20 @@ class ValidationNode(BaseNode):
                     "file_path": file_path,
                     "status": "failed",
                     "error": file_info.get("error", "Processing failed"),
-                    "validation_timestamp": self._get_timestamp()
+                    "validation_timestamp": validation_timestamp
                 }
             else:
-                # Try to parse the response content as JSON
-                try:
-                    extracted_data = json.loads(response_content)
-                    logger.info(f"Successfully parsed JSON response for file: {file_path}")
-                except json.JSONDecodeError:
+                # Only attempt a JSON parse when the response starts like a JSON document,
+                # so plain-text responses skip the raise-and-catch
+                extracted_data = None
+                if _JSON_START.match(response_content):
+                    try:
+                        extracted_data = orjson.loads(response_content)
+                        logger.info("Successfully parsed JSON response for file: %s", file_path)
+                    except orjson.JSONDecodeError:
+                        pass
+                
+                if extracted_data is None:
                     # If not JSON, treat as plain text
                     logger.warning(f"Response for file {file_path} is not valid JSON, treating as plain text")
                     extracted_data = {
@@ -74,21 +89,18 @@ class ValidationNode(BaseNode):
                     "status": "completed",
                     "extracted_data": extracted_data,
                     "usage_metadata": file_info.get("usage_metadata", {}),
-                    "validation_timestamp": self._get_timestamp()
+                    "validation_timestamp": validation_timestamp
                 }
                 
-                logger.info(f"Successfully validated result for file: {file_path}")
+                logger.info("Successfully validated result for file: %s", file_path)
             
-            return self.Outputs(
-                validated_result=json.dumps(validated_result),
-                file_info=self.inputs.file_info
+            # Fields are serialized here, so skip re-validating them
+            return self.Outputs.model_construct(
+                validated_result=orjson.dumps(validated_result).decode(),
+                file_info=self.inputs.file_info,
+                status=validated_result["status"]
             )
             
         except Exception as e:
             logger.error(f"Validation process failed: {e}")
             raise
-    
-    def _get_timestamp(self) -> str:
-        """Get current timestamp as ISO string."""
-        from datetime import datetime
-        return datetime.now().isoformat()
@@ -9,30 +9,32 @@ from nodes.database_write import DatabaseWriteNode
 from nodes.failure_handling import FailureHandlingNode
 from logging_config import setup_logging
 
-# Set up logging
-setup_logging(level=logging.INFO, log_file="logs/app.log")
+# Guard start-up so worker processes that re-import this module (PDF extraction pool) do not start a runtime
+if __name__ == "__main__":
+    # Set up logging
+    setup_logging(level=logging.INFO, log_file="logs/app.log")
 
-# Load environment variables from .env file
-# EXOSPHERE_STATE_MANAGER_URI is the URI of the state manager
-# EXOSPHERE_API_KEY is the key of the runtime
-load_dotenv()
+    # Load environment variables from .env file
+    # EXOSPHERE_STATE_MANAGER_URI is the URI of the state manager
+    # EXOSPHERE_API_KEY is the key of the runtime
+    load_dotenv()
 
-logger = logging.getLogger(__name__)
-logger.info("Starting sync-process-docs runtime")
+    logger = logging.getLogger(__name__)
+    logger.info("Starting sync-process-docs runtime")
 
-# Note on node ordering:
-# The order of node classes in the `nodes` list does not define execution sequence.
-# Nodes are registered with the state manager; orchestration and dependencies are handled externally.
-# Nodes are listed in logical processing order for readability only.
-Runtime(
-    name="sync-process-docs-runtime",
-    namespace="sync-process-docs",
-    nodes=[
-        CSVInputNode,
-        FileDistributionNode,
-        SyncProcessingNode,
-        ValidationNode,
-        DatabaseWriteNode,
-        FailureHandlingNode
-    ]
-).start()
+    # Note on node ordering:
+    # The order of node classes in the `nodes` list does not define execution sequence.
+    # Nodes are registered with the state manager; orchestration and dependencies are handled externally.
+    # Nodes are listed in logical processing order for readability only.
+    Runtime(
+        name="sync-process-docs-runtime",
+        namespace="sync-process-docs",
+        nodes=[
+            CSVInputNode,
+            FileDistributionNode,
+            SyncProcessingNode,
+            ValidationNode,
+            DatabaseWriteNode,
+            FailureHandlingNode
+        ]
+    ).start()